@@ -11,6 +11,27 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from finance_calculator.config import quote_stream_config, startup_config
+from finance_calculator.startup import warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "finance_calculator.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once the apps are loaded, as it uses the loan serializers
+from loan_calculator.quote_stream import quote_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] != "websocket":
+        return await django_application(scope, receive, send)
+    if scope["path"] == quote_stream_config.PATH:
+        return await quote_stream(scope, receive, send)
+
+    # Django serves HTTP only, so any other WebSocket is refused
+    await receive()
+    await send({"type": "websocket.close"})
+
+
+if startup_config.WARM_UP:
+    warm_up()
@@ -12,6 +12,10 @@ class DBConfig:
     NAME = os.getenv("DB_NAME", "finance_calculator")
     PORT = os.getenv("DB_PORT", "5432")
     TEST_NAME = os.getenv("TEST_DB_NAME", "test_finance_calculator")
+    # Seconds a connection is reused for, 0 to close it after every request
+    CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 0))
+    # Databases the loans are spread over, the default database holds them if empty
+    SHARD_NAMES = [name for name in os.getenv("DB_SHARD_NAMES", "").split(",") if name]
 
 
 class GeneralConfig:
@@ -24,5 +28,71 @@ class GeneralConfig:
     STATIC_URL = "static/"
 
 
+class StartupConfig:
+    WARM_UP = bool(int(os.getenv("WARM_UP_ON_START", 1)))
+
+
+class IdempotencyConfig:
+    HEADER = "HTTP_IDEMPOTENCY_KEY"
+    KEY_MAX_LENGTH = 255
+    TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+    # Lease of a claim whose request has not finished, above the worker timeout
+    CLAIM_TIMEOUT_SECONDS = int(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", 60))
+    MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", 100000))
+    PRUNE_EVERY = int(os.getenv("IDEMPOTENCY_PRUNE_EVERY", 1000))
+
+
+class ArchiveConfig:
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 365))
+    CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", 1000))
+
+
+class RateLimitConfig:
+    API_KEY_HEADER = "HTTP_X_API_KEY"
+    # Only these keys get a bucket of their own, other clients are keyed by address
+    API_KEYS = {key for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key}
+    # Reverse proxies in front of the app, whose X-Forwarded-For entries are trusted
+    NUM_PROXIES = int(os.getenv("RATE_LIMIT_NUM_PROXIES", 0))
+    BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # Either memory or sqlite
+    SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "rate_limit.sqlite3")
+    CAPACITY = float(os.getenv("RATE_LIMIT_CAPACITY", 60))
+    REFILL_PER_SECOND = float(os.getenv("RATE_LIMIT_REFILL_PER_SECOND", 10))
+    MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", 10000))
+
+
+class LoadSheddingConfig:
+    MAX_IN_FLIGHT = int(os.getenv("LOAD_SHEDDING_MAX_IN_FLIGHT", 64))
+    MAX_DB_LATENCY_MS = float(os.getenv("LOAD_SHEDDING_MAX_DB_LATENCY_MS", 250))
+    RETRY_AFTER_SECONDS = int(os.getenv("LOAD_SHEDDING_RETRY_AFTER_SECONDS", 1))
+
+
+class QuoteStreamConfig:
+    PATH = "/ws/v1/quotes/"
+    DEBOUNCE_MS = float(os.getenv("QUOTE_STREAM_DEBOUNCE_MS", 50))
+    MAX_CONNECTIONS = int(os.getenv("QUOTE_STREAM_MAX_CONNECTIONS", 100))
+
+
+class SnapshotConfig:
+    # Age below which the summary snapshot is served without checking the database
+    TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", 1))
+    # Interval of the full recount catching deleted loans
+    RECOUNT_SECONDS = float(os.getenv("SNAPSHOT_RECOUNT_SECONDS", 300))
+
+
+class ShardingConfig:
+    CLIENT_ID_HEADER = "HTTP_X_CLIENT_ID"
+    CLIENT_ID_MAX_LENGTH = 64
+    # Threads running the queries of every shard in parallel, shared by all requests
+    FAN_OUT_WORKERS = int(os.getenv("DB_SHARD_FAN_OUT_WORKERS", 32))
+
+
 general_config = GeneralConfig()
 db_config = DBConfig()
+startup_config = StartupConfig()
+idempotency_config = IdempotencyConfig()
+archive_config = ArchiveConfig()
+rate_limit_config = RateLimitConfig()
+load_shedding_config = LoadSheddingConfig()
+quote_stream_config = QuoteStreamConfig()
+snapshot_config = SnapshotConfig()
+sharding_config = ShardingConfig()
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from finance_calculator.config import db_config, general_config
+from finance_calculator.config import db_config, general_config, rate_limit_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +30,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "loan_calculator.middleware.LoadSheddingMiddleware",
+    "django.middleware.gzip.GZipMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -67,12 +69,30 @@ DATABASES = {
         "PASSWORD": db_config.PWD,
         "HOST": db_config.HOST,
         "PORT": db_config.PORT,
+        "CONN_MAX_AGE": db_config.CONN_MAX_AGE,
         "TEST": {
             "NAME": db_config.TEST_NAME,
         },
     }
 }
 
+# Loans are spread over these databases by LoanShardRouter, see DB_SHARD_NAMES
+LOAN_SHARDS = []
+for index, name in enumerate(db_config.SHARD_NAMES):
+    LOAN_SHARDS.append(f"loans_{index}")
+    DATABASES[f"loans_{index}"] = {
+        **DATABASES["default"],
+        "NAME": name,
+        "TEST": {"NAME": f"test_{name}"},
+    }
+
+DATABASE_ROUTERS = ["loan_calculator.routers.LoanShardRouter"]
+
+REST_FRAMEWORK = {
+    # Without trusted proxies X-Forwarded-For is ignored, so clients cannot spoof it
+    "NUM_PROXIES": rate_limit_config.NUM_PROXIES,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
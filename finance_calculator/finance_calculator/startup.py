@@ -0,0 +1,31 @@
+import logging
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """
+    Import what the first request would need before the worker accepts traffic.
+
+    Loads the URLconf, which imports the views, DRF and the loan services that would
+    otherwise be imported by the first request, and connects to every configured
+    database once so the database backend modules are imported and bad settings show
+    up at startup. No connection is kept: the application may be loaded before the
+    server forks its workers, which must not share a connection, so the first request
+    of each worker still opens its own.
+
+    Returns:
+        None
+    """
+
+    get_resolver().url_patterns
+
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        except DatabaseError as exc:
+            logger.warning("Warm-up could not connect to %r: %s", connection.alias, exc)
+    connections.close_all()
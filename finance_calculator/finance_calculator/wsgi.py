@@ -11,6 +11,12 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from finance_calculator.config import startup_config
+from finance_calculator.startup import warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "finance_calculator.settings")
 
 application = get_wsgi_application()
+
+if startup_config.WARM_UP:
+    warm_up()
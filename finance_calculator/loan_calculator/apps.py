@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class LoanCalculatorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "loan_calculator"
+
+    def ready(self):
+        from loan_calculator.services.annuity import AnnuityFactorTable
+
+        AnnuityFactorTable.build()
@@ -0,0 +1,76 @@
+from django.db.models import Q, QuerySet
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
+
+
+class RangeFilterBackend(BaseFilterBackend):
+    """
+    A filter backend narrowing the queryset by ``<field>_min`` and ``<field>_max`` query params.
+
+    The view lists the filterable fields and their parsers in ``range_filter_fields``,
+    e.g. ``{"total_amount": serializers.FloatField()}``; bounds are inclusive and are
+    pushed down to the database as ``__gte`` / ``__lte`` lookups.
+    """
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        lookups = {}
+        errors = {}
+        for field_name, field in getattr(view, "range_filter_fields", {}).items():
+            for suffix, lookup in (("min", "gte"), ("max", "lte")):
+                param = f"{field_name}_{suffix}"
+                value = request.query_params.get(param)
+                if value is None:
+                    continue
+                try:
+                    lookups[f"{field_name}__{lookup}"] = field.to_internal_value(value)
+                except serializers.ValidationError as exc:
+                    errors[param] = exc.detail
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return queryset.filter(**lookups)
+
+
+class KeysetFilterBackend(BaseFilterBackend):
+    """
+    A filter backend returning the page after a ``created_at_before`` / ``id_before`` cursor.
+
+    The cursor is the ``created_at`` and ``id`` of the last row of the previous page,
+    in the default newest-first ordering of the view. Ids break ties between loans
+    created at the same time; they are unique per shard only, so loans of two shards
+    sharing both their creation time and id may fall on either page. The bounds are
+    pushed down to the database, so every shard skips the earlier pages through the
+    ``created_at`` index instead of an offset.
+    """
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view) -> QuerySet:
+        cursor = {}
+        errors = {}
+        for param, field in (
+            ("created_at_before", serializers.DateTimeField()),
+            ("id_before", serializers.IntegerField()),
+        ):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                cursor[param] = field.to_internal_value(value)
+            except serializers.ValidationError as exc:
+                errors[param] = exc.detail
+
+        if not cursor and not errors:
+            return queryset
+        if "created_at_before" not in request.query_params:
+            errors["id_before"] = ["This cursor requires created_at_before."]
+        if request.query_params.get("ordering"):
+            errors["ordering"] = ["Cursors only apply to the default ordering."]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        if "id_before" not in cursor:
+            return queryset.filter(created_at__lt=cursor["created_at_before"])
+        return queryset.filter(
+            Q(created_at__lt=cursor["created_at_before"])
+            | Q(created_at=cursor["created_at_before"], id__lt=cursor["id_before"])
+        )
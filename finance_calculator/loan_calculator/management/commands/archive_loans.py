@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from finance_calculator.config import archive_config
+from loan_calculator.services.archive import LoanArchiver
+
+
+class Command(BaseCommand):
+    help = "Move loans older than the given age from the Loan table into the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=archive_config.ARCHIVE_AFTER_DAYS,
+            help="Archive loans created more than this many days ago.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=archive_config.CHUNK_SIZE,
+            help="Number of loans moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        archived = LoanArchiver.archive_loans(
+            older_than_days=options["older_than_days"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} loans."))
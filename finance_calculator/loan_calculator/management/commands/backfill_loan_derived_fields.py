@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from loan_calculator.services.backfill import LoanBackfiller
+
+
+class Command(BaseCommand):
+    help = "Fill in the stored derived columns of loans saved before they existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of loans updated per query.",
+        )
+
+    def handle(self, *args, **options):
+        updated = LoanBackfiller.backfill(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} loans."))
@@ -0,0 +1,288 @@
+import json
+import math
+import os
+import queue
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf]
+# Request outcomes other than success, reported apart from one another
+OUTCOMES_BY_STATUS = {429: "throttled", 503: "shed"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a mix of /loans/ creates and lists against a locally started server "
+        "and report throughput and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default=None,
+            help="Base URL of a running server. A local server on a scratch "
+            "sqlite database is started when omitted.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Number of client threads."
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Arrival rate in requests per second. Zero runs a closed loop "
+            "where every thread sends its next request as soon as the last one ends.",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Test duration in seconds."
+        )
+        parser.add_argument(
+            "--create-ratio",
+            type=float,
+            default=0.5,
+            help="Share of requests that create a loan, the rest list loans.",
+        )
+        parser.add_argument(
+            "--output", default=None, help="Path of the JSON file to save results to."
+        )
+        parser.add_argument(
+            "--api-key",
+            default=None,
+            help="X-Api-Key header sent with every request, e.g. a key listed in "
+            "RATE_LIMIT_API_KEYS of the server passed with --url.",
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["create_ratio"] <= 1:
+            raise CommandError("--create-ratio must be between 0 and 1.")
+
+        rng = random.Random(options["seed"])
+        server = None
+        base_url = options["url"]
+        if base_url is None:
+            server, base_url = self.start_local_server()
+
+        try:
+            samples, elapsed = self.run_load(
+                base_url=base_url.rstrip("/"),
+                concurrency=options["concurrency"],
+                rate=options["rate"],
+                duration=options["duration"],
+                create_ratio=options["create_ratio"],
+                rng=rng,
+                api_key=options["api_key"],
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        results = {
+            "parameters": {
+                key: options[key]
+                for key in ("concurrency", "rate", "duration", "create_ratio", "seed")
+            },
+            "elapsed_seconds": elapsed,
+            "operations": {
+                operation: self.summarize(
+                    [sample for sample in samples if sample[0] == operation], elapsed
+                )
+                for operation in ("create", "list")
+            },
+            "total": self.summarize(samples, elapsed),
+        }
+        self.print_report(results)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results saved to {options['output']}")
+
+    def start_local_server(self) -> tuple[subprocess.Popen, str]:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        database = Path(tempfile.mkdtemp()) / "load_test.sqlite3"
+        env = {
+            **os.environ,
+            "DB_NAME": str(database),
+            "SECRET_KEY": settings.SECRET_KEY or "load-test",
+            "ALLOWED_HOSTS": "127.0.0.1",
+            "DEBUG": "0",
+            # Every local client shares the loopback address, so the rate limiter
+            # would otherwise measure itself instead of the service
+            "RATE_LIMIT_CAPACITY": "1e9",
+            "RATE_LIMIT_REFILL_PER_SECOND": "1e9",
+        }
+        manage_py = str(settings.BASE_DIR / "manage.py")
+        subprocess.run(
+            [sys.executable, manage_py, "migrate", "--verbosity=0"], env=env, check=True
+        )
+        server = subprocess.Popen(
+            [sys.executable, manage_py, "runserver", "--noreload", f"127.0.0.1:{port}"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        base_url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(f"{base_url}/api/v1/loans/?fields=id", timeout=1)
+                return server, base_url
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+        server.terminate()
+        raise CommandError("The local server did not start within 30 seconds.")
+
+    def run_load(
+        self,
+        base_url: str,
+        concurrency: int,
+        rate: float,
+        duration: float,
+        create_ratio: float,
+        rng: random.Random,
+        api_key: str | None = None,
+    ) -> tuple[list[tuple[str, float, str]], float]:
+        samples = []
+        samples_lock = threading.Lock()
+        arrivals = queue.Queue()
+        started_at = time.monotonic()
+        deadline = started_at + duration
+
+        def worker():
+            while True:
+                if rate:
+                    scheduled_at = arrivals.get()
+                    if scheduled_at is None:
+                        return
+                else:
+                    scheduled_at = time.monotonic()
+                    if scheduled_at >= deadline:
+                        return
+
+                operation = "create" if rng.random() < create_ratio else "list"
+                outcome = self.send_request(base_url, operation, rng, api_key)
+                # Open-loop latency is measured from the scheduled arrival so queueing
+                # delay is not hidden when the server falls behind
+                latency = time.monotonic() - scheduled_at
+                with samples_lock:
+                    samples.append((operation, latency, outcome))
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+
+        if rate:
+            arrival = 0
+            while (scheduled_at := started_at + arrival / rate) < deadline:
+                time.sleep(max(0.0, scheduled_at - time.monotonic()))
+                arrivals.put(scheduled_at)
+                arrival += 1
+            for _ in threads:
+                arrivals.put(None)
+
+        for thread in threads:
+            thread.join()
+        return samples, time.monotonic() - started_at
+
+    @staticmethod
+    def send_request(
+        base_url: str, operation: str, rng: random.Random, api_key: str | None = None
+    ) -> str:
+        url = f"{base_url}/api/v1/loans/"
+        headers = {"X-Api-Key": api_key} if api_key else {}
+        if operation == "create":
+            payload = {
+                "purchase_price": rng.randrange(50000, 1000000, 1000),
+                "interest_rate": rng.randrange(1, 81) / 8,
+                "dollar_down_payment": rng.randrange(1000, 50000, 1000),
+                "percentage_down_payment": None,
+                "mortgage_term": rng.choice([120, 180, 240, 360]),
+            }
+            request = urllib.request.Request(
+                url,
+                data=json.dumps(payload).encode(),
+                headers={**headers, "Content-Type": "application/json"},
+                method="POST",
+            )
+        else:
+            request = urllib.request.Request(url, headers=headers)
+
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return "ok"
+        except urllib.error.HTTPError as exc:
+            return OUTCOMES_BY_STATUS.get(exc.code, "error")
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            return "error"
+
+    @staticmethod
+    def summarize(samples: list[tuple[str, float, str]], elapsed: float) -> dict:
+        latencies_ms = sorted(sample[1] * 1000 for sample in samples)
+        summary = {
+            "requests": len(samples),
+            "errors": sum(1 for sample in samples if sample[2] == "error"),
+            **{
+                outcome: sum(1 for sample in samples if sample[2] == outcome)
+                for outcome in OUTCOMES_BY_STATUS.values()
+            },
+            "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        }
+        for percentile in (50, 90, 95, 99):
+            rank = math.ceil(percentile / 100 * len(latencies_ms)) - 1
+            summary[f"p{percentile}_ms"] = (
+                latencies_ms[max(rank, 0)] if latencies_ms else None
+            )
+        summary["max_ms"] = latencies_ms[-1] if latencies_ms else None
+
+        histogram = {}
+        lower = 0
+        for upper in HISTOGRAM_BUCKETS_MS:
+            label = f"<={upper}ms" if upper != math.inf else f">{lower}ms"
+            histogram[label] = sum(
+                1 for latency in latencies_ms if lower < latency <= upper
+            )
+            lower = upper
+        summary["histogram"] = histogram
+        return summary
+
+    def print_report(self, results: dict) -> None:
+        for name, summary in [
+            *results["operations"].items(),
+            ("total", results["total"]),
+        ]:
+            if not summary["requests"]:
+                continue
+            self.stdout.write(
+                f"{name:>6}: {summary['requests']} requests, "
+                f"{summary['errors']} errors, "
+                f"{summary['throttled']} throttled, "
+                f"{summary['shed']} shed, "
+                f"{summary['throughput_rps']:.1f} req/s, "
+                f"p50 {summary['p50_ms']:.1f}ms, "
+                f"p90 {summary['p90_ms']:.1f}ms, "
+                f"p99 {summary['p99_ms']:.1f}ms, "
+                f"max {summary['max_ms']:.1f}ms"
+            )
+
+        total = results["total"]
+        peak = max(total["histogram"].values(), default=0)
+        for label, count in total["histogram"].items():
+            bar = "#" * round(40 * count / peak) if peak else ""
+            self.stdout.write(f"{label:>10} {count:>8} {bar}")
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from loan_calculator.services.loan_store import LoanStoreError, LoanStoreJobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run bounded-memory batch jobs over memory-mapped loan store files: "
+        "export or import the Loan table, or calculate loan details for an inputs file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Number of records processed at a time.",
+        )
+        subparsers = parser.add_subparsers(dest="job", required=True)
+
+        export_parser = subparsers.add_parser("export", help="Export the Loan table.")
+        export_parser.add_argument("path", help="Path of the loans file to write.")
+
+        import_parser = subparsers.add_parser(
+            "import", help="Import a loans file into the Loan table."
+        )
+        import_parser.add_argument("path", help="Path of the loans file to read.")
+
+        calculate_parser = subparsers.add_parser(
+            "calculate", help="Calculate loan details for an inputs file."
+        )
+        calculate_parser.add_argument("inputs_path", help="Path of the inputs file.")
+        calculate_parser.add_argument(
+            "results_path", help="Path of the results file to write."
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        try:
+            if options["job"] == "export":
+                count = LoanStoreJobs.export_loans(options["path"], chunk_size)
+                message = f"Exported {count} loans."
+            elif options["job"] == "import":
+                count = LoanStoreJobs.import_loans(options["path"], chunk_size)
+                message = f"Imported {count} loans."
+            else:
+                count = LoanStoreJobs.calculate(
+                    options["inputs_path"], options["results_path"], chunk_size
+                )
+                message = f"Calculated {count} loans."
+        except (LoanStoreError, OSError) as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,216 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter started with `-X importtime`, so every import is cold
+PROBE = """
+import json, os, sys, time
+
+started_at = time.perf_counter()
+entry, warm = sys.argv[1], sys.argv[2] == "1"
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "finance_calculator.settings")
+milestones = {}
+
+if entry == "manage":
+    import django
+
+    django.setup()
+    milestones["app_ready_ms"] = (time.perf_counter() - started_at) * 1000
+else:
+    import importlib
+
+    application = importlib.import_module(f"finance_calculator.{entry}").application
+    milestones["app_ready_ms"] = (time.perf_counter() - started_at) * 1000
+    if warm:
+        from finance_calculator.startup import warm_up
+
+        warm_up_started_at = time.perf_counter()
+        warm_up()
+        milestones["warm_up_ms"] = (time.perf_counter() - warm_up_started_at) * 1000
+
+    request_started_at = time.perf_counter()
+    if entry == "wsgi":
+        from wsgiref.util import setup_testing_defaults
+
+        environ = {"PATH_INFO": "/api/v1/"}
+        setup_testing_defaults(environ)
+        statuses = []
+        b"".join(application(environ, lambda status, headers: statuses.append(status)))
+        status = int(statuses[0].split()[0])
+    else:
+        import asyncio
+
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/v1/",
+            "raw_path": b"/api/v1/",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"127.0.0.1")],
+            "client": ("127.0.0.1", 0),
+            "server": ("127.0.0.1", 80),
+        }
+        asyncio.run(application(scope, receive, send))
+        status = messages[0]["status"]
+    milestones["first_request_ms"] = (time.perf_counter() - request_started_at) * 1000
+    milestones["first_request_status"] = status
+    milestones["time_to_first_request_ms"] = (
+        time.perf_counter() - started_at
+    ) * 1000
+
+print(json.dumps(milestones))
+"""
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the WSGI, ASGI or manage.py entry point in a fresh interpreter and "
+        "report per-module import time, app-ready time and time to first request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entry",
+            choices=["wsgi", "asgi", "manage"],
+            default="wsgi",
+            help="Entry point to profile.",
+        )
+        parser.add_argument(
+            "--no-warm-up",
+            action="store_true",
+            help="Profile without the warm-up hook, so the first request pays for it.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=15, help="Number of slowest modules to report."
+        )
+        parser.add_argument(
+            "--output", default=None, help="Path of the JSON file to save results to."
+        )
+        parser.add_argument(
+            "--max-first-request-ms",
+            type=float,
+            default=None,
+            help="Fail when the time to first request exceeds this many milliseconds.",
+        )
+
+    def handle(self, *args, **options):
+        if options["max_first_request_ms"] is not None and options["entry"] == "manage":
+            raise CommandError("--max-first-request-ms needs the wsgi or asgi entry.")
+
+        env = {
+            **os.environ,
+            "SECRET_KEY": settings.SECRET_KEY or "profile-startup",
+            "ALLOWED_HOSTS": "127.0.0.1",
+            "WARM_UP_ON_START": "0",
+        }
+        started_at = time.perf_counter()
+        probe = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                PROBE,
+                options["entry"],
+                "0" if options["no_warm_up"] else "1",
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall_time_ms = (time.perf_counter() - started_at) * 1000
+        if probe.returncode:
+            raise CommandError(f"The startup probe failed:\n{probe.stderr}")
+
+        imports = self.parse_import_times(probe.stderr)
+        results = {
+            "entry": options["entry"],
+            "warm_up": not options["no_warm_up"],
+            "process_wall_time_ms": wall_time_ms,
+            **json.loads(probe.stdout.strip().splitlines()[-1]),
+            "total_import_ms": sum(module["self_ms"] for module in imports),
+            "slowest_imports": sorted(
+                imports, key=lambda module: module["self_ms"], reverse=True
+            )[: options["top"]],
+            "slowest_top_level_imports": sorted(
+                (module for module in imports if module["depth"] == 0),
+                key=lambda module: module["cumulative_ms"],
+                reverse=True,
+            )[: options["top"]],
+        }
+        self.print_report(results)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results saved to {options['output']}")
+        if options["max_first_request_ms"] is not None:
+            self.check_first_request_time(results, options["max_first_request_ms"])
+
+    @staticmethod
+    def parse_import_times(stderr: str) -> list[dict]:
+        imports = []
+        for line in stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match is None:
+                continue
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(
+                {
+                    "module": name,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                    "depth": len(indent) // 2,
+                }
+            )
+        return imports
+
+    @staticmethod
+    def check_first_request_time(results: dict, max_first_request_ms: float) -> None:
+        status = results["first_request_status"]
+        if status >= 500:
+            raise CommandError(f"The first request failed with status {status}.")
+        if results["time_to_first_request_ms"] > max_first_request_ms:
+            raise CommandError(
+                f"Time to first request {results['time_to_first_request_ms']:.1f}ms "
+                f"exceeds {max_first_request_ms:.1f}ms."
+            )
+
+    def print_report(self, results: dict) -> None:
+        for key in (
+            "process_wall_time_ms",
+            "total_import_ms",
+            "app_ready_ms",
+            "warm_up_ms",
+            "first_request_ms",
+            "time_to_first_request_ms",
+        ):
+            if key in results:
+                self.stdout.write(f"{key:>26}: {results[key]:.1f}")
+
+        self.stdout.write("Slowest top-level imports (cumulative):")
+        for module in results["slowest_top_level_imports"]:
+            self.stdout.write(f"{module['cumulative_ms']:>10.1f}ms  {module['module']}")
+        self.stdout.write("Slowest modules (self):")
+        for module in results["slowest_imports"]:
+            self.stdout.write(f"{module['self_ms']:>10.1f}ms  {module['module']}")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from loan_calculator.services.idempotency import IdempotencyService
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired Idempotency-Key records and trim the store to its size bound."
+    )
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyService.prune()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} idempotency keys."))
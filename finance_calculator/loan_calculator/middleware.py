@@ -0,0 +1,98 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+from finance_calculator.config import load_shedding_config
+from loan_calculator.services.shards import LoanShards
+
+
+class LoadSheddingMiddleware:
+    """
+    A middleware rejecting requests early while the worker is overloaded.
+
+    Every request is rejected with 503 while ``MAX_IN_FLIGHT`` requests are already
+    being served by the worker. Requests writing to the database, the actions a view
+    lists in ``db_write_actions``, are also rejected while the moving average of the
+    database query latency is above ``MAX_DB_LATENCY_MS``, so reads and calculations
+    keep working.
+    The latency covers the queries of the default database and of every loan shard.
+    The average decays while no queries run, so shedding stops once writes would no
+    longer queue up behind slow queries.
+    """
+
+    # Weight of the latest query in the moving average of the database latency
+    LATENCY_SMOOTHING = 0.2
+    # Time for the average to halve while no queries run
+    LATENCY_HALF_LIFE_SECONDS = 1.0
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self._db_latency_ms = 0.0
+        self._db_latency_updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            if self.in_flight >= load_shedding_config.MAX_IN_FLIGHT:
+                return self.shed("Error! The server is overloaded, retry later!")
+            self.in_flight += 1
+
+        try:
+            with ExitStack() as stack:
+                for alias in {DEFAULT_DB_ALIAS, *LoanShards.get_aliases()}:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(self.time_query)
+                    )
+                return self.get_response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.is_db_write(request, view_func):
+            return None
+        with self._lock:
+            if self.db_latency_ms > load_shedding_config.MAX_DB_LATENCY_MS:
+                return self.shed("Error! The database is overloaded, retry later!")
+        return None
+
+    @staticmethod
+    def is_db_write(request, view_func) -> bool:
+        if request.method in SAFE_METHODS:
+            return False
+        # Viewset routes map their methods to actions
+        action = getattr(view_func, "actions", {}).get(request.method.lower())
+        view_class = getattr(view_func, "cls", None)
+        return action in getattr(view_class, "db_write_actions", ())
+
+    @property
+    def db_latency_ms(self) -> float:
+        elapsed = time.monotonic() - self._db_latency_updated_at
+        return self._db_latency_ms * 0.5 ** (elapsed / self.LATENCY_HALF_LIFE_SECONDS)
+
+    def time_query(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            latency_ms = (time.perf_counter() - started_at) * 1000
+            with self._lock:
+                db_latency_ms = self.db_latency_ms
+                self._db_latency_ms = db_latency_ms + self.LATENCY_SMOOTHING * (
+                    latency_ms - db_latency_ms
+                )
+                self._db_latency_updated_at = time.monotonic()
+
+    @staticmethod
+    def shed(message: str) -> JsonResponse:
+        response = JsonResponse(
+            {"detail": message}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        response.headers["Retry-After"] = str(load_shedding_config.RETRY_AFTER_SECONDS)
+        return response
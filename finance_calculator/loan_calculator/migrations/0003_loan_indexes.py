@@ -0,0 +1,37 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0002_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["created_at"], name="loan_calcul_created_4d9ce2_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["total_amount"], name="loan_calcul_total_a_fce431_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["interest_rate"], name="loan_calcul_interes_06da4f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["mortgage_term"], name="loan_calcul_mortgag_79c7d5_idx"
+            ),
+        ),
+    ]
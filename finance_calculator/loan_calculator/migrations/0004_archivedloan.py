@@ -0,0 +1,43 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:35
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0003_loan_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedLoan",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("total_amount", models.FloatField()),
+                ("total_over_loan_term", models.FloatField()),
+                ("monthly_payment", models.FloatField()),
+                ("interest_rate", models.FloatField()),
+                ("mortgage_term", models.FloatField()),
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("period", models.DateField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["period"], name="loan_calcul_period_0ae63f_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="loan_calcul_created_106323_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
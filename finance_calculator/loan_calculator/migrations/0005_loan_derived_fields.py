@@ -0,0 +1,72 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0004_archivedloan"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedloan",
+            name="annual_interest_rate",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedloan",
+            name="interest_share",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedloan",
+            name="mortgage_term_in_months",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedloan",
+            name="total_interest",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="loan",
+            name="annual_interest_rate",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="loan",
+            name="interest_share",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="loan",
+            name="mortgage_term_in_months",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="loan",
+            name="total_interest",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["annual_interest_rate"], name="loan_calcul_annual__001205_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["mortgage_term_in_months"],
+                name="loan_calcul_mortgag_b18e16_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["interest_share"], name="loan_calcul_interes_b29e31_idx"
+            ),
+        ),
+    ]
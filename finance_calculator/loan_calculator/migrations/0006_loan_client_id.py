@@ -0,0 +1,23 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0005_loan_derived_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedloan",
+            name="client_id",
+            field=models.CharField(default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="loan",
+            name="client_id",
+            field=models.CharField(default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_loan_ids(apps, schema_editor):
+    ArchivedLoan = apps.get_model("loan_calculator", "ArchivedLoan")
+    ArchivedLoan.objects.using(schema_editor.connection.alias).update(loan_id=F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0006_loan_client_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedloan",
+            name="shard",
+            field=models.CharField(default="default", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="archivedloan",
+            name="loan_id",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(copy_loan_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="archivedloan",
+            name="loan_id",
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="archivedloan",
+            name="id",
+            field=models.BigAutoField(
+                auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="archivedloan",
+            constraint=models.UniqueConstraint(
+                fields=("shard", "loan_id"), name="archivedloan_shard_loan_id_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-19 22:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0007_archivedloan_surrogate_key"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["updated_at"], name="loan_calcul_updated_d0682f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-19 22:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loan_calculator", "0008_loan_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["total_interest"], name="loan_calcul_total_i_9589ba_idx"
+            ),
+        ),
+    ]
@@ -3,9 +3,61 @@ from django.db import models
 from base_model import BaseModel
 
 
-class Loan(BaseModel):
+class AbstractLoan(BaseModel):
     total_amount = models.FloatField()
     total_over_loan_term = models.FloatField()
     monthly_payment = models.FloatField()
     interest_rate = models.FloatField()
     mortgage_term = models.FloatField()  # Term in years
+    # Derived values stored at save time for reports
+    annual_interest_rate = models.FloatField(null=True)  # Rate as entered, in percent
+    mortgage_term_in_months = models.PositiveIntegerField(null=True)
+    total_interest = models.FloatField(null=True)
+    interest_share = models.FloatField(null=True)  # Interest / total over loan term
+    client_id = models.CharField(max_length=64, default="")  # Shard key
+
+    class Meta:
+        abstract = True
+
+
+class Loan(AbstractLoan):
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["total_amount"]),
+            models.Index(fields=["interest_rate"]),
+            models.Index(fields=["mortgage_term"]),
+            models.Index(fields=["annual_interest_rate"]),
+            models.Index(fields=["mortgage_term_in_months"]),
+            models.Index(fields=["total_interest"]),
+            models.Index(fields=["interest_share"]),
+        ]
+
+
+class ArchivedLoan(AbstractLoan):
+    # Loan ids are unique per shard only, so a loan is identified by both
+    shard = models.CharField(max_length=64, default="default")  # Database alias
+    loan_id = models.BigIntegerField()  # Primary key of the archived Loan
+    period = models.DateField()  # First day of the month the loan was created in
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["period"]),
+            models.Index(fields=["created_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shard", "loan_id"], name="archivedloan_shard_loan_id_unique"
+            )
+        ]
+
+
+class IdempotencyKey(BaseModel):
+    key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(max_length=64)
+    response_data = models.JSONField(null=True)
+    response_status = models.PositiveSmallIntegerField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"])]
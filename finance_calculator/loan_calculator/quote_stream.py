@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+
+from finance_calculator.config import quote_stream_config
+from loan_calculator.serializers import LoanInputSerializer
+from loan_calculator.services.quote import QuoteService
+
+# Close code telling the client to reconnect later, see RFC 6455
+TRY_AGAIN_LATER = 1013
+
+
+class QuoteStream:
+    """
+    An ASGI WebSocket application pushing loan quotes while the inputs are edited.
+
+    A client keeps one connection per session and sends JSON deltas of the loan inputs,
+    e.g. ``{"interest_rate": 6.5, "seq": 12}``. The deltas are merged into the session
+    inputs and coalesced: the quote is calculated once ``DEBOUNCE_MS`` after the first
+    pending delta, whatever the number of deltas received meanwhile. Every quote
+    echoes the ``seq`` of the last merged delta, so the client can drop stale answers,
+    and reports the latency from that first delta. Nothing is saved.
+
+    At most ``MAX_CONNECTIONS`` connections are served by a worker; others are closed
+    with code 1013 (try again later).
+    """
+
+    def __init__(self):
+        self.connections = 0
+
+    async def __call__(self, scope, receive, send) -> None:
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        if self.connections >= quote_stream_config.MAX_CONNECTIONS:
+            await send({"type": "websocket.close", "code": TRY_AGAIN_LATER})
+            return
+
+        self.connections += 1
+        try:
+            await send({"type": "websocket.accept"})
+            await QuoteSession(send).run(receive)
+        finally:
+            self.connections -= 1
+
+
+class QuoteSession:
+    """
+    The state of a single quote stream connection.
+
+    Only the fields of ``LoanInputSerializer`` are merged from the deltas; other keys
+    are dropped, so a client cannot grow the session inputs.
+    """
+
+    INPUT_FIELDS = frozenset(LoanInputSerializer().fields)
+
+    def __init__(self, send):
+        self.send = send
+        self.inputs = {}
+        self.seq = None
+        self.pending_since = None
+        self.pending = asyncio.Event()
+
+    async def run(self, receive) -> None:
+        quoting = asyncio.create_task(self.quote_pending_inputs())
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                if message["type"] == "websocket.receive":
+                    await self.merge(message.get("text") or message.get("bytes"))
+        finally:
+            quoting.cancel()
+            try:
+                await quoting
+            except asyncio.CancelledError:
+                pass
+
+    async def merge(self, payload: str | bytes | None) -> None:
+        try:
+            delta = json.loads(payload or "")
+        except ValueError:
+            delta = None
+        if not isinstance(delta, dict):
+            await self.send_json(
+                {"errors": {"non_field_errors": ["Error! Invalid JSON object!"]}}
+            )
+            return
+
+        self.seq = delta.pop("seq", self.seq)
+        self.inputs.update(
+            (name, value) for name, value in delta.items() if name in self.INPUT_FIELDS
+        )
+        if self.pending_since is None:
+            self.pending_since = time.perf_counter()
+        self.pending.set()
+
+    async def quote_pending_inputs(self) -> None:
+        while True:
+            await self.pending.wait()
+            await asyncio.sleep(quote_stream_config.DEBOUNCE_MS / 1000)
+            self.pending.clear()
+            pending_since, self.pending_since = self.pending_since, None
+
+            calculation_started_at = time.perf_counter()
+            quote = QuoteService.calculate_quote(self.inputs)
+            finished_at = time.perf_counter()
+            await self.send_json(
+                {
+                    **quote,
+                    "seq": self.seq,
+                    "calculation_ms": round(
+                        (finished_at - calculation_started_at) * 1000, 3
+                    ),
+                    "latency_ms": round((finished_at - pending_since) * 1000, 3),
+                }
+            )
+
+    async def send_json(self, data: dict) -> None:
+        await self.send({"type": "websocket.send", "text": json.dumps(data)})
+
+
+quote_stream = QuoteStream()
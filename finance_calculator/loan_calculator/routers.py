@@ -0,0 +1,37 @@
+from django.conf import settings
+
+from loan_calculator.models import IdempotencyKey, Loan
+from loan_calculator.services.shards import LoanShards
+
+
+class LoanShardRouter:
+    """
+    A database router writing loans to the shard of their client.
+
+    Saving a loan instance routes it by its client id. Querysets carry no client id,
+    so lists and aggregates fan out over the shards with ``LoanShards``, and
+    bulk operations must pick their shard with ``using()``. Shards only hold the loan
+    table and the idempotency keys of the loans created on them; every other model
+    stays on the default database. Without configured
+    shards the router leaves everything on the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_instance(model, hints.get("instance"))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_instance(model, hints.get("instance"))
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db not in settings.LOAN_SHARDS:
+            return None
+        return app_label == Loan._meta.app_label and model_name in {
+            Loan._meta.model_name,
+            IdempotencyKey._meta.model_name,
+        }
+
+    @staticmethod
+    def _db_for_instance(model, instance) -> str | None:
+        if model is not Loan or instance is None or not LoanShards.is_enabled():
+            return None
+        return LoanShards.get_alias(instance.client_id)
@@ -1,13 +1,27 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from rest_framework import serializers
 
-from loan_calculator.models import Loan
+from loan_calculator.models import ArchivedLoan, Loan
 
 
 class LoanOutputSerializer(serializers.ModelSerializer):
     class Meta:
         model = Loan
-        fields = "__all__"
+        exclude = ["client_id"]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Drop the fields not requested by the `fields` projection
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class ArchivedLoanOutputSerializer(LoanOutputSerializer):
+    class Meta:
+        model = ArchivedLoan
+        exclude = ["period", "client_id", "shard"]
 
 
 class LoanInputSerializer(serializers.Serializer):
@@ -16,6 +30,7 @@ class LoanInputSerializer(serializers.Serializer):
     dollar_down_payment = serializers.FloatField(
         allow_null=True, validators=[MinValueValidator(0)]
     )
+    # A percentage of the purchase price, e.g. 20 for a fifth, as in affordability
     percentage_down_payment = serializers.FloatField(
         allow_null=True, validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
@@ -31,3 +46,39 @@ class LoanInputSerializer(serializers.Serializer):
                 "Either 'dollar_down_payment' or 'percentage_down_payment' must have a value."
             )
         return data
+
+
+class AffordabilityInputSerializer(serializers.Serializer):
+    monthly_budget = serializers.FloatField(validators=[MinValueValidator(0)])
+    interest_rate = serializers.FloatField(validators=[MinValueValidator(0)])
+    dollar_down_payment = serializers.FloatField(
+        allow_null=True, validators=[MinValueValidator(0)]
+    )
+    percentage_down_payment = serializers.FloatField(
+        allow_null=True, validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+    mortgage_term = serializers.IntegerField(validators=[MinValueValidator(1)])
+    annual_property_tax_rate = serializers.FloatField(
+        default=0, validators=[MinValueValidator(0)]
+    )
+    annual_insurance = serializers.FloatField(
+        default=0, validators=[MinValueValidator(0)]
+    )
+    annual_pmi_rate = serializers.FloatField(
+        default=0, validators=[MinValueValidator(0)]
+    )
+
+    def validate(self, data):
+        dollar_down_payment = data.get("dollar_down_payment")
+        percentage_down_payment = data.get("percentage_down_payment")
+
+        if not any([dollar_down_payment, percentage_down_payment]):
+            raise serializers.ValidationError(
+                "Either 'dollar_down_payment' or 'percentage_down_payment' must have a value."
+            )
+        # With the whole price paid upfront only taxes limit the price
+        if percentage_down_payment == 100 and not data["annual_property_tax_rate"]:
+            raise serializers.ValidationError(
+                "'percentage_down_payment' of 100 requires 'annual_property_tax_rate'."
+            )
+        return data
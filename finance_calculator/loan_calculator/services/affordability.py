@@ -0,0 +1,148 @@
+import math
+from typing import Any, Iterable
+
+from loan_calculator.services.annuity import AnnuityFactorTable
+
+
+class AffordabilityCalculator:
+    """
+    A class to calculate the maximum purchase price affordable on a monthly budget.
+
+    The monthly budget covers principal and interest, property taxes (a yearly rate of
+    the purchase price), homeowner's insurance (a yearly dollar amount) and private
+    mortgage insurance (a yearly rate of the loan amount, charged while the down payment
+    is below ``PMI_FREE_DOWN_PAYMENT_SHARE`` of the purchase price).
+
+    Attributes:
+        PMI_FREE_DOWN_PAYMENT_SHARE (float): The down payment share from which PMI is not charged.
+
+    Methods:
+        calculate_max_purchase_prices: Calculate the maximum purchase price for every row of inputs.
+        calculate_max_purchase_price: Calculate the maximum purchase price for a monthly budget.
+        get_payment_factor: Calculate the monthly payment per dollar of loan.
+    """
+
+    PMI_FREE_DOWN_PAYMENT_SHARE = 0.2
+
+    @classmethod
+    def calculate_max_purchase_prices(
+        cls, rows: Iterable[dict[str, Any]]
+    ) -> list[dict[str, float]]:
+        """
+        Calculate the maximum purchase price for every row of inputs.
+
+        Args:
+            rows (Iterable[dict[str, Any]]): The keyword arguments of ``calculate_max_purchase_price`` per row.
+
+        Returns:
+            list[dict[str, float]]: The affordability details of every row.
+        """
+
+        return [cls.calculate_max_purchase_price(**row) for row in rows]
+
+    @classmethod
+    def calculate_max_purchase_price(
+        cls,
+        monthly_budget: float,
+        interest_rate: float,
+        mortgage_term: int,
+        dollar_down_payment: float | None,
+        percentage_down_payment: float | None,
+        annual_property_tax_rate: float = 0,
+        annual_insurance: float = 0,
+        annual_pmi_rate: float = 0,
+    ) -> dict[str, float]:
+        """
+        Calculate the maximum purchase price for a monthly budget.
+
+        Args:
+            monthly_budget (float): The total monthly housing budget.
+            interest_rate (float): The interest rate of the loan.
+            mortgage_term (int): The mortgage term in months.
+            dollar_down_payment (float | None): The down payment in dollars.
+            percentage_down_payment (float | None): The down payment as a percentage (0-100) of the purchase price.
+            annual_property_tax_rate (float): The yearly property tax as a percentage of the purchase price.
+            annual_insurance (float): The yearly homeowner's insurance in dollars.
+            annual_pmi_rate (float): The yearly PMI as a percentage of the loan amount.
+
+        Returns:
+            dict[str, float]: The maximum purchase price, the down payment, the loan amount
+                and the monthly payment split into its parts.
+        """
+
+        payment_factor = cls.get_payment_factor(
+            interest_rate=interest_rate, mortgage_term=mortgage_term
+        )
+        monthly_tax_rate = annual_property_tax_rate / (12 * 100)
+        monthly_pmi_rate = annual_pmi_rate / (12 * 100)
+        available = monthly_budget - annual_insurance / 12
+
+        if percentage_down_payment:
+            # budget = price * ((1 - share) * (factor + pmi) + tax) + insurance
+            down_payment_share = percentage_down_payment / 100
+            if down_payment_share >= cls.PMI_FREE_DOWN_PAYMENT_SHARE:
+                monthly_pmi_rate = 0
+            purchase_price = available / (
+                (1 - down_payment_share) * (payment_factor + monthly_pmi_rate)
+                + monthly_tax_rate
+            )
+        else:
+            # budget = (price - down) * (factor + pmi) + price * tax + insurance
+            def solve(pmi_rate):
+                return (
+                    available + dollar_down_payment * (payment_factor + pmi_rate)
+                ) / (payment_factor + pmi_rate + monthly_tax_rate)
+
+            pmi_free_price = dollar_down_payment / cls.PMI_FREE_DOWN_PAYMENT_SHARE
+            purchase_price = solve(0)
+            if purchase_price > pmi_free_price:
+                # Beyond this price PMI is charged, which lowers the affordable price,
+                # but never below the highest price that needs no PMI
+                purchase_price = max(solve(monthly_pmi_rate), pmi_free_price)
+            if purchase_price * cls.PMI_FREE_DOWN_PAYMENT_SHARE <= dollar_down_payment:
+                monthly_pmi_rate = 0
+
+        purchase_price = max(math.floor(purchase_price * 100) / 100, 0)
+        down_payment = (
+            purchase_price * percentage_down_payment / 100
+            if percentage_down_payment
+            else min(dollar_down_payment, purchase_price)
+        )
+        loan_amount = purchase_price - down_payment
+        return {
+            "max_purchase_price": purchase_price,
+            "down_payment": round(down_payment, 2),
+            "loan_amount": round(loan_amount, 2),
+            "monthly_principal_and_interest": round(loan_amount * payment_factor, 2),
+            "monthly_property_tax": round(purchase_price * monthly_tax_rate, 2),
+            "monthly_insurance": round(annual_insurance / 12, 2),
+            "monthly_pmi": round(loan_amount * monthly_pmi_rate, 2),
+        }
+
+    @staticmethod
+    def get_payment_factor(interest_rate: float, mortgage_term: int) -> float:
+        """
+        Calculate the monthly payment per dollar of loan.
+
+        Args:
+            interest_rate (float): The interest rate of the loan.
+            mortgage_term (int): The mortgage term in months.
+
+        Returns:
+            float: The annuity factor of the rate and term.
+        """
+
+        factors = AnnuityFactorTable.lookup(
+            interest_rate=interest_rate, mortgage_term_in_months=mortgage_term
+        )
+        if factors is not None:
+            numerator, denominator = factors
+            return numerator / denominator
+
+        monthly_interest_rate = interest_rate / (12 * 100)
+        # The growth of a dollar over the term, exact even for rates so tiny that
+        # (1 + rate) ** term rounds to 1
+        growth = math.expm1(mortgage_term * math.log1p(monthly_interest_rate))
+        if not growth:
+            return 1 / mortgage_term
+        return monthly_interest_rate * (growth + 1) / growth
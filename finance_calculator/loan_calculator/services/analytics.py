@@ -0,0 +1,49 @@
+from contextlib import ExitStack
+from typing import Any
+
+from loan_calculator.services.snapshot import LoanSnapshot
+
+
+class LoanAnalytics:
+    """
+    A class to calculate aggregates over the whole loan book from the columnar snapshots.
+
+    Attributes:
+        None
+
+    Methods:
+        summarize: Calculate count, sum, average, minimum and maximum of every numeric column.
+    """
+
+    @staticmethod
+    def summarize(*snapshots: LoanSnapshot) -> dict[str, Any]:
+        """
+        Calculate count, sum, average, minimum and maximum of every numeric column.
+
+        Args:
+            *snapshots (LoanSnapshot): The refreshed loan snapshots, one per shard.
+
+        Returns:
+            dict[str, Any]: A dictionary with the loans count and per-column statistics.
+        """
+
+        with ExitStack() as stack:
+            for snapshot in snapshots:
+                stack.enter_context(snapshot.lock)
+
+            loans_count = sum(len(snapshot) for snapshot in snapshots)
+            summary = {"count": loans_count}
+            for name in LoanSnapshot.COLUMNS:
+                columns = [snapshot.column(name) for snapshot in snapshots]
+                total = sum(sum(values) for values in columns)
+                summary[name] = {
+                    "sum": round(total, 2),
+                    "avg": round(total / loans_count, 2) if loans_count else None,
+                    "min": min(
+                        (min(values) for values in columns if values), default=None
+                    ),
+                    "max": max(
+                        (max(values) for values in columns if values), default=None
+                    ),
+                }
+        return summary
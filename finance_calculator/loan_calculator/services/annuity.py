@@ -0,0 +1,84 @@
+from array import array
+
+
+class AnnuityFactorTable:
+    """
+    A precomputed lookup table of annuity factors for the common rate x term lattice.
+
+    Every factor is stored as the numerator ``r * (1 + r) ** n`` and the denominator
+    ``(1 + r) ** n - 1`` of the annuity formula, so a lookup reproduces the direct
+    computation bit for bit.
+
+    Attributes:
+        RATE_STEP (float): The spacing of the interest rate lattice, in percent.
+        MAX_RATE (float): The highest interest rate on the lattice, in percent.
+        TERM_STEP (int): The spacing of the mortgage term lattice, in months.
+        MAX_TERM (int): The longest mortgage term on the lattice, in months.
+
+    Methods:
+        build: Precompute the annuity factors for the whole lattice.
+        lookup: Return the precomputed annuity factors for the given rate and term.
+    """
+
+    RATE_STEP = 0.125
+    MAX_RATE = 15.0
+    TERM_STEP = 12
+    MAX_TERM = 480
+
+    _numerators: array | None = None
+    _denominators: array | None = None
+
+    @classmethod
+    def build(cls) -> None:
+        """
+        Precompute the annuity factors for the whole lattice.
+
+        Returns:
+            None
+        """
+
+        numerators = array("d")
+        denominators = array("d")
+        rates_count = int(cls.MAX_RATE / cls.RATE_STEP)
+        for rate_index in range(1, rates_count + 1):
+            monthly_interest_rate = rate_index * cls.RATE_STEP / (12 * 100)
+            for mortgage_term_in_months in range(
+                cls.TERM_STEP, cls.MAX_TERM + 1, cls.TERM_STEP
+            ):
+                compound = (1 + monthly_interest_rate) ** mortgage_term_in_months
+                numerators.append(monthly_interest_rate * compound)
+                denominators.append(compound - 1)
+        cls._numerators, cls._denominators = numerators, denominators
+
+    @classmethod
+    def lookup(
+        cls, interest_rate: float, mortgage_term_in_months: int
+    ) -> tuple[float, float] | None:
+        """
+        Return the precomputed annuity factors for the given rate and term.
+
+        Args:
+            interest_rate (float): The interest rate of the loan.
+            mortgage_term_in_months (int): The mortgage term in months.
+
+        Returns:
+            tuple[float, float] | None: The numerator and denominator of the annuity factor,
+                or None if the rate and term are off the lattice.
+        """
+
+        if not cls.RATE_STEP <= interest_rate <= cls.MAX_RATE:
+            return None
+        if not cls.TERM_STEP <= mortgage_term_in_months <= cls.MAX_TERM:
+            return None
+
+        rate_position = interest_rate / cls.RATE_STEP
+        term_position = mortgage_term_in_months / cls.TERM_STEP
+        if rate_position != int(rate_position) or term_position != int(term_position):
+            return None
+
+        if cls._numerators is None:
+            cls.build()
+
+        terms_count = cls.MAX_TERM // cls.TERM_STEP
+        index = (int(rate_position) - 1) * terms_count + int(term_position) - 1
+        return cls._numerators[index], cls._denominators[index]
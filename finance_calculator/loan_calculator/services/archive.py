@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from loan_calculator.models import ArchivedLoan, Loan
+from loan_calculator.services.shards import LoanShards
+
+
+class LoanArchiver:
+    """
+    A class to move old loans from the Loan table into the monthly-partitioned archive.
+
+    Attributes:
+        None
+
+    Methods:
+        archive_loans: Move loans older than the given age into the archive.
+        archive_chunk: Move a single chunk of loans into the archive in one transaction.
+    """
+
+    @classmethod
+    def archive_loans(cls, older_than_days: int, chunk_size: int) -> int:
+        """
+        Move loans older than the given age into the archive.
+
+        The loans of every shard are archived, one shard after another.
+
+        Args:
+            older_than_days (int): The age in days after which loans are archived.
+            chunk_size (int): The number of loans moved per transaction.
+
+        Returns:
+            int: The number of archived loans.
+        """
+
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        archived = 0
+        for using in LoanShards.get_aliases():
+            while archived_in_chunk := cls.archive_chunk(
+                cutoff=cutoff, chunk_size=chunk_size, using=using
+            ):
+                archived += archived_in_chunk
+        return archived
+
+    @staticmethod
+    def archive_chunk(
+        cutoff: datetime, chunk_size: int, using: str = DEFAULT_DB_ALIAS
+    ) -> int:
+        """
+        Move a single chunk of loans into the archive in one transaction.
+
+        The archive lives on the default database. For a shard, the archive rows are
+        committed just before the loans are deleted, and rows archived already are
+        skipped, so a chunk whose delete failed is archived again without duplicates.
+
+        Args:
+            cutoff (datetime): The creation time before which loans are archived.
+            chunk_size (int): The maximum number of loans to move.
+            using (str): The database alias of the shard holding the loans.
+
+        Returns:
+            int: The number of archived loans, zero when nothing is left to archive.
+        """
+
+        field_names = [field.name for field in Loan._meta.concrete_fields]
+        with transaction.atomic(using=using), transaction.atomic():
+            loans = list(
+                Loan.objects.using(using)
+                .filter(created_at__lt=cutoff)
+                .order_by("id")
+                .values(*field_names)[:chunk_size]
+            )
+            if not loans:
+                return 0
+
+            ArchivedLoan.objects.bulk_create(
+                [
+                    ArchivedLoan(
+                        **{name: value for name, value in loan.items() if name != "id"},
+                        loan_id=loan["id"],
+                        shard=using,
+                        period=loan["created_at"].date().replace(day=1),
+                    )
+                    for loan in loans
+                ],
+                ignore_conflicts=True,
+            )
+            Loan.objects.using(using).filter(
+                id__in=[loan["id"] for loan in loans]
+            ).delete()
+        return len(loans)
@@ -0,0 +1,107 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from loan_calculator.models import AbstractLoan, ArchivedLoan, Loan
+from loan_calculator.services.loan import LoanCalculator
+from loan_calculator.services.shards import LoanShards
+
+
+class LoanBackfiller:
+    """
+    A class to fill in the derived columns of loans saved before they were stored.
+
+    Archived loans are backfilled as well, since they were copied with whatever
+    derived columns the loan had when it was archived.
+
+    Attributes:
+        DERIVED_FIELDS (list[str]): The derived columns written by the backfill.
+
+    Methods:
+        backfill: Fill in the derived columns of every loan missing them.
+        backfill_chunk: Fill in the derived columns of a single chunk of loans.
+    """
+
+    DERIVED_FIELDS = [
+        "annual_interest_rate",
+        "mortgage_term_in_months",
+        "total_interest",
+        "interest_share",
+    ]
+
+    @classmethod
+    def backfill(cls, chunk_size: int) -> int:
+        """
+        Fill in the derived columns of every loan and archived loan missing them.
+
+        The loans of every shard are updated, one shard after another, followed by
+        the archived loans.
+
+        Args:
+            chunk_size (int): The number of loans updated per query.
+
+        Returns:
+            int: The number of updated loans.
+        """
+
+        tables = [(Loan, using) for using in LoanShards.get_aliases()]
+        tables.append((ArchivedLoan, DEFAULT_DB_ALIAS))
+        updated = 0
+        for model, using in tables:
+            last_id = 0
+            while loans := list(
+                model.objects.using(using)
+                .filter(id__gt=last_id, mortgage_term_in_months__isnull=True)
+                .order_by("id")
+                .only(
+                    "id",
+                    "total_amount",
+                    "monthly_payment",
+                    "total_over_loan_term",
+                    "mortgage_term",
+                )[:chunk_size]
+            ):
+                updated += cls.backfill_chunk(loans=loans, using=using, model=model)
+                last_id = loans[-1].id
+        return updated
+
+    @classmethod
+    def backfill_chunk(
+        cls,
+        loans: list[AbstractLoan],
+        using: str = DEFAULT_DB_ALIAS,
+        model: type[AbstractLoan] = Loan,
+    ) -> int:
+        """
+        Fill in the derived columns of a single chunk of loans.
+
+        Args:
+            loans (list[AbstractLoan]): The loans or archived loans to update.
+            using (str): The database alias of the shard holding the loans.
+            model (type[AbstractLoan]): The model of the loans, Loan or ArchivedLoan.
+
+        Returns:
+            int: The number of updated loans.
+        """
+
+        now = timezone.now()
+        for loan in loans:
+            loan.updated_at = now
+            loan.mortgage_term_in_months = round(loan.mortgage_term * 12)
+            loan.annual_interest_rate = LoanCalculator.calculate_annual_interest_rate(
+                loan_amount=loan.total_amount,
+                monthly_payment=loan.monthly_payment,
+                mortgage_term_in_months=loan.mortgage_term_in_months,
+            )
+            loan.total_interest = (
+                LoanCalculator.calculate_total_interest_over_loan_term(
+                    total_over_loan_term=loan.total_over_loan_term,
+                    loan_amount=loan.total_amount,
+                )
+            )
+            loan.interest_share = LoanCalculator.calculate_interest_share(
+                total_over_loan_term=loan.total_over_loan_term,
+                loan_amount=loan.total_amount,
+            )
+        return model.objects.using(using).bulk_update(
+            loans, [*cls.DERIVED_FIELDS, "updated_at"]
+        )
@@ -0,0 +1,65 @@
+import hashlib
+
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import quote_etag
+
+from loan_calculator.services.shards import LoanShards
+
+
+class ConditionalGet:
+    """
+    A class to calculate cache validators for querysets served by list endpoints.
+
+    Only an ETag is calculated. A Last-Modified date has a resolution of seconds and
+    misses deleted rows, so it would let clients revalidate stale lists.
+
+    Attributes:
+        None
+
+    Methods:
+        get_etag: Calculate the ETag validator of a queryset.
+    """
+
+    @staticmethod
+    def get_etag(queryset: QuerySet, full_path: str) -> str:
+        """
+        Calculate the ETag validator of a queryset.
+
+        The validator comes from a single aggregate query over the queryset per shard,
+        so it is computed without fetching or serializing any rows.
+
+        Args:
+            queryset (QuerySet): The filtered queryset to be listed.
+            full_path (str): The request path with its query string.
+
+        Returns:
+            str: The quoted ETag.
+        """
+
+        shard_aggregates = LoanShards.fan_out_queryset(
+            queryset.order_by(),
+            lambda shard_queryset: shard_queryset.aggregate(
+                last_updated_at=Max("updated_at"),
+                last_id=Max("id"),
+                rows_count=Count("id"),
+            ),
+        )
+        last_updated_at = max(
+            (
+                aggregates["last_updated_at"]
+                for aggregates in shard_aggregates
+                if aggregates["last_updated_at"] is not None
+            ),
+            default=None,
+        )
+        fingerprint = "|".join(
+            [
+                full_path,
+                last_updated_at.isoformat() if last_updated_at else "",
+                *(
+                    f"{aggregates['last_id']}|{aggregates['rows_count']}"
+                    for aggregates in shard_aggregates
+                ),
+            ]
+        )
+        return quote_etag(hashlib.sha256(fingerprint.encode()).hexdigest())
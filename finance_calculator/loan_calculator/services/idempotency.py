@@ -0,0 +1,196 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from finance_calculator.config import idempotency_config
+from loan_calculator.models import IdempotencyKey
+from loan_calculator.services.shards import LoanShards
+
+
+class IdempotencyService:
+    """
+    A class to deduplicate retried requests by their Idempotency-Key.
+
+    A key is claimed in its own transaction before the request is executed, so retries
+    arriving meanwhile see it in progress. The response is then stored on the claim
+    in the same transaction as the loan, on the shard of the loan. A claim is leased
+    for ``CLAIM_TIMEOUT_SECONDS`` from its creation time: a retry finding an older
+    claim without a response assumes its worker died, e.g. killed by a timeout, and
+    takes the key over. Should that worker still finish, storing its response fails
+    and rolls its loan back, so the request is executed once.
+
+    Attributes:
+        CLAIM_ATTEMPTS (int): The number of times a key is looked up and claimed.
+
+    Methods:
+        replay_or_execute: Return the stored response for the key or execute the request once.
+        prune: Delete expired keys and keep the store within its size bound.
+        get_request_hash: Calculate the fingerprint of the request payload.
+        get_expiry_cutoff: Calculate the creation time before which keys are expired.
+        get_claim_cutoff: Calculate the creation time before which pending claims are abandoned.
+    """
+
+    CLAIM_ATTEMPTS = 3
+
+    _writes_since_prune = 0
+
+    @classmethod
+    def replay_or_execute(
+        cls,
+        key: str,
+        request_data: dict[str, Any],
+        execute: Callable[[], dict[str, Any]],
+        using: str = DEFAULT_DB_ALIAS,
+    ) -> dict[str, Any]:
+        """
+        Return the stored response for the key or execute the request once.
+
+        Args:
+            key (str): The Idempotency-Key sent by the client.
+            request_data (dict[str, Any]): The validated request payload.
+            execute (Callable[[], dict[str, Any]]): A callable returning the response data and status.
+            using (str): The database alias of the shard the request writes to.
+
+        Returns:
+            dict[str, Any]: A dictionary containing the response data, status and whether it was replayed.
+        """
+
+        request_hash = cls.get_request_hash(request_data=request_data)
+        keys = IdempotencyKey.objects.using(using)
+        for _ in range(cls.CLAIM_ATTEMPTS):
+            record = keys.filter(
+                key=key, created_at__gte=cls.get_expiry_cutoff()
+            ).first()
+            if record is not None:
+                if (
+                    record.request_hash == request_hash
+                    and record.response_status is None
+                    and record.created_at < cls.get_claim_cutoff()
+                ):
+                    keys.filter(pk=record.pk, response_status__isnull=True).delete()
+                    continue
+                return cls._replay(record=record, request_hash=request_hash)
+            try:
+                with transaction.atomic(using=using):
+                    keys.filter(
+                        key=key, created_at__lt=cls.get_expiry_cutoff()
+                    ).delete()
+                    record = keys.create(key=key, request_hash=request_hash)
+                break
+            except IntegrityError:
+                # Claimed by a concurrent request, which may have released it since
+                continue
+        else:
+            return cls._in_progress()
+
+        try:
+            with transaction.atomic(using=using):
+                response = execute()
+                record.response_data = response["data"]
+                record.response_status = response["status"]
+                record.save(update_fields=["response_data", "response_status"])
+        except Exception:
+            # Release the claim, so the request can be retried
+            record.delete()
+            raise
+
+        cls._writes_since_prune += 1
+        if cls._writes_since_prune >= idempotency_config.PRUNE_EVERY:
+            cls.prune()
+        return {**response, "replayed": False}
+
+    @classmethod
+    def prune(cls) -> int:
+        """
+        Delete expired keys and keep the store within its size bound.
+
+        The bound applies to every shard on its own.
+
+        Returns:
+            int: The number of deleted keys.
+        """
+
+        cls._writes_since_prune = 0
+        deleted = 0
+        for using in LoanShards.get_aliases():
+            keys = IdempotencyKey.objects.using(using)
+            expired, _ = keys.filter(created_at__lt=cls.get_expiry_cutoff()).delete()
+            deleted += expired
+
+            boundary = list(
+                keys.order_by("-created_at").values_list("created_at", flat=True)[
+                    idempotency_config.MAX_KEYS : idempotency_config.MAX_KEYS + 1
+                ]
+            )
+            if boundary:
+                overflow, _ = keys.filter(created_at__lte=boundary[0]).delete()
+                deleted += overflow
+        return deleted
+
+    @staticmethod
+    def get_request_hash(request_data: dict[str, Any]) -> str:
+        """
+        Calculate the fingerprint of the request payload.
+
+        Args:
+            request_data (dict[str, Any]): The validated request payload.
+
+        Returns:
+            str: The SHA-256 hex digest of the payload.
+        """
+
+        payload = json.dumps(request_data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def get_expiry_cutoff() -> datetime:
+        """
+        Calculate the creation time before which keys are expired.
+
+        Returns:
+            datetime: The expiry cutoff.
+        """
+
+        return timezone.now() - timedelta(seconds=idempotency_config.TTL_SECONDS)
+
+    @staticmethod
+    def get_claim_cutoff() -> datetime:
+        """
+        Calculate the creation time before which pending claims are abandoned.
+
+        Returns:
+            datetime: The claim cutoff.
+        """
+
+        return timezone.now() - timedelta(
+            seconds=idempotency_config.CLAIM_TIMEOUT_SECONDS
+        )
+
+    @classmethod
+    def _replay(cls, record: IdempotencyKey, request_hash: str) -> dict[str, Any]:
+        if record.request_hash != request_hash:
+            return {
+                "data": "Error! Idempotency-Key was already used with a different payload!",
+                "status": status.HTTP_422_UNPROCESSABLE_ENTITY,
+                "replayed": False,
+            }
+        if record.response_status is None:
+            return cls._in_progress()
+        return {
+            "data": record.response_data,
+            "status": record.response_status,
+            "replayed": True,
+        }
+
+    @staticmethod
+    def _in_progress() -> dict[str, Any]:
+        return {
+            "data": "Error! A request with this Idempotency-Key is in progress!",
+            "status": status.HTTP_409_CONFLICT,
+            "replayed": False,
+        }
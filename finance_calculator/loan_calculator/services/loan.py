@@ -1,9 +1,11 @@
+import math
 from typing import Any
 
 from django.db import IntegrityError
 from rest_framework import status
 
 from loan_calculator.models import Loan
+from loan_calculator.services.annuity import AnnuityFactorTable
 
 
 class LoanCalculator:
@@ -23,6 +25,8 @@ class LoanCalculator:
         calculate_total_over_loan_term: Calculate the total payment over the loan term.
         calculate_total_interest_over_loan_term: Calculate the total interest paid over the loan term.
         calculate_mortgage_term_in_years: Convert mortgage term from months to years.
+        calculate_interest_share: Calculate the share of interest in the total payment.
+        calculate_annual_interest_rate: Find the interest rate of a loan from its monthly payment.
     """
 
     @classmethod
@@ -33,6 +37,7 @@ class LoanCalculator:
         dollar_down_payment: float | None,
         percentage_down_payment: float | None,
         mortgage_term: int,
+        client_id: str = "",
     ) -> dict[str, dict[str, status] | str]:
         """
         Calculate loan details and save them to the database.
@@ -41,8 +46,9 @@ class LoanCalculator:
             purchase_price (float): The purchase price of the loan.
             interest_rate (float): The interest rate of the loan.
             dollar_down_payment (float | None): The down payment in dollars.
-            percentage_down_payment (float | None): The down payment as a percentage of the purchase price.
+            percentage_down_payment (float | None): The down payment as a percentage (0-100) of the purchase price.
             mortgage_term (int): The mortgage term in months.
+            client_id (str): The id of the client the loan is saved for, which picks its shard.
 
         Returns:
             dict[str, dict[str, status] | str]: A dictionary containing either calculated loan details or error message.
@@ -70,6 +76,9 @@ class LoanCalculator:
             monthly_payment=monthly_payment,
             total_over_loan_term=total_over_loan_term,
             interest_rate=total_interest_paid_over_loan_term,
+            annual_interest_rate=interest_rate,
+            mortgage_term_in_months=mortgage_term,
+            client_id=client_id,
         )
         loan_details = {
             "total_amount": total_amount,
@@ -99,7 +108,7 @@ class LoanCalculator:
             purchase_price (float): The purchase price of the loan.
             interest_rate (float): The interest rate of the loan.
             dollar_down_payment (float | None): The down payment in dollars.
-            percentage_down_payment (float | None): The down payment as a percentage of the purchase price.
+            percentage_down_payment (float | None): The down payment as a percentage (0-100) of the purchase price.
             mortgage_term (int): The mortgage term in months.
 
         Returns:
@@ -143,6 +152,9 @@ class LoanCalculator:
         interest_rate: float,
         total_amount: float,
         total_over_loan_term: float,
+        annual_interest_rate: float | None = None,
+        mortgage_term_in_months: int | None = None,
+        client_id: str = "",
     ) -> dict[str, str | bool | Any]:
         """
         Save loan details to the database.
@@ -153,18 +165,34 @@ class LoanCalculator:
             interest_rate (float): The interest rate of the loan.
             total_amount (float): The total loan amount.
             total_over_loan_term (float): The total payment over the loan term.
+            annual_interest_rate (float | None): The interest rate of the loan as entered, in percent.
+            mortgage_term_in_months (int | None): The mortgage term in months.
+            client_id (str): The id of the client the loan is saved for, which picks its shard.
 
         Returns:
             dict[str, int]: Either success response status or dict consists of error message and HTTP status code.
         """
         try:
-            Loan.objects.create(
+            # Saving the instance lets the router pick the shard of the client
+            loan = Loan(
                 total_amount=total_amount,
                 total_over_loan_term=total_over_loan_term,
                 mortgage_term=mortgage_term_in_years,
                 interest_rate=interest_rate,
                 monthly_payment=monthly_payment,
+                annual_interest_rate=annual_interest_rate,
+                mortgage_term_in_months=mortgage_term_in_months,
+                total_interest=cls.calculate_total_interest_over_loan_term(
+                    total_over_loan_term=total_over_loan_term,
+                    loan_amount=total_amount,
+                ),
+                interest_share=cls.calculate_interest_share(
+                    total_over_loan_term=total_over_loan_term,
+                    loan_amount=total_amount,
+                ),
+                client_id=client_id,
             )
+            loan.save(force_insert=True)
         except (ValueError, TypeError, IntegrityError):
             return {
                 "msg": "Error! Invalid input arguments!",
@@ -190,13 +218,13 @@ class LoanCalculator:
         Args:
             purchase_price (float): The purchase price of the loan.
             dollar_down_payment (float | None): The down payment in dollars.
-            percentage_down_payment (float | None): The down payment as a percentage of the purchase price.
+            percentage_down_payment (float | None): The down payment as a percentage (0-100) of the purchase price.
 
         Returns:
             float: The calculated down payment amount.
         """
         down_payment = (
-            purchase_price * percentage_down_payment
+            purchase_price * percentage_down_payment / 100
             if percentage_down_payment
             else dollar_down_payment
         )
@@ -235,6 +263,14 @@ class LoanCalculator:
             float: The monthly payment amount.
         """
 
+        factors = AnnuityFactorTable.lookup(
+            interest_rate=interest_rate,
+            mortgage_term_in_months=mortgage_term_in_months,
+        )
+        if factors is not None:
+            numerator, denominator = factors
+            return round(loan_amount * numerator / denominator, 2)
+
         monthly_interest_rate = interest_rate / (12 * 100)
         return round(
             (
@@ -295,3 +331,63 @@ class LoanCalculator:
         """
 
         return mortgage_term / 12
+
+    @staticmethod
+    def calculate_interest_share(
+        total_over_loan_term: float, loan_amount: float
+    ) -> float:
+        """
+        Calculate the share of interest in the total payment over the loan term.
+
+        Args:
+            total_over_loan_term (float): The total payment over the loan term.
+            loan_amount (float): The total loan amount.
+
+        Returns:
+            float: The interest share, between 0 and 1.
+        """
+
+        if not total_over_loan_term:
+            return 0.0
+        return round((total_over_loan_term - loan_amount) / total_over_loan_term, 6)
+
+    @staticmethod
+    def calculate_annual_interest_rate(
+        loan_amount: float, monthly_payment: float, mortgage_term_in_months: int
+    ) -> float | None:
+        """
+        Find the interest rate of a loan from its monthly payment.
+
+        The monthly payment grows with the rate, so the rate is found by bisection.
+        The payment is always more than the loan amount times the monthly rate, so
+        the rate at which that product equals the payment bounds the bisection.
+        The payment is rounded to cents, so the rate is rounded to 0.001 percent.
+
+        Args:
+            loan_amount (float): The total loan amount.
+            monthly_payment (float): The monthly payment amount.
+            mortgage_term_in_months (int): The mortgage term in months.
+
+        Returns:
+            float | None: The interest rate of the loan, in percent, or None if no
+                rate gives the monthly payment.
+        """
+
+        if monthly_payment * mortgage_term_in_months <= loan_amount:
+            return 0.0
+        if loan_amount <= 0:
+            return None
+
+        low, high = 0.0, 12 * 100 * monthly_payment / loan_amount
+        for _ in range(60):
+            monthly_interest_rate = (low + high) / 2 / (12 * 100)
+            # Discounting instead of compounding cannot overflow for high rates
+            discount = -math.expm1(
+                -mortgage_term_in_months * math.log1p(monthly_interest_rate)
+            )
+            payment = loan_amount * monthly_interest_rate / discount
+            if payment < monthly_payment:
+                low = (low + high) / 2
+            else:
+                high = (low + high) / 2
+        return round((low + high) / 2, 3)
@@ -0,0 +1,453 @@
+import math
+import mmap
+import struct
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from django.conf import settings
+
+from loan_calculator.models import Loan
+from loan_calculator.services.loan import LoanCalculator
+from loan_calculator.services.shards import LoanShards
+
+MAGIC = b"LOANSTOR"
+VERSION = 3
+# Magic, schema version, record kind, fields per record, records count, padding
+HEADER = struct.Struct("<8sIIIQ4x")
+# Count of the strings following the records, then the byte length of every string
+STRING_LENGTH = struct.Struct("<I")
+
+# Every field is a little-endian float64, so a record is `8 * len(fields)` bytes
+# and any chunk of records is a flat, zero-copy view of doubles. Text values are
+# stored once in a table of UTF-8 strings after the records and referenced by index.
+SCHEMAS = {
+    "inputs": (
+        "purchase_price",
+        "interest_rate",
+        "dollar_down_payment",  # NaN when not given
+        "percentage_down_payment",  # NaN when not given
+        "mortgage_term",  # Term in months
+    ),
+    "results": (
+        "total_amount",
+        "monthly_payment",
+        "total_over_loan_term",
+        "total_interest_paid_over_loan_term",
+        "mortgage_term_in_years",
+    ),
+    "loans": (
+        "id",
+        "created_at",  # POSIX timestamp
+        "updated_at",  # POSIX timestamp
+        "client",  # Index of the client id in the strings table
+        "total_amount",
+        "total_over_loan_term",
+        "monthly_payment",
+        "interest_rate",
+        "mortgage_term",
+        "annual_interest_rate",  # NaN when not backfilled
+        "mortgage_term_in_months",  # NaN when not backfilled
+        "total_interest",  # NaN when not backfilled
+        "interest_share",  # NaN when not backfilled
+    ),
+}
+KINDS = list(SCHEMAS)
+
+
+class LoanStoreError(Exception):
+    """Raised when a loan store file cannot be read or written."""
+
+
+class LoanStoreWriter:
+    """
+    A writer appending fixed-width records to a loan store file.
+
+    The records count in the header and the strings table are written when the
+    writer is closed.
+
+    Attributes:
+        kind (str): The record kind, one of ``SCHEMAS``.
+        fields (tuple[str, ...]): The fields of a record.
+        records_count (int): The number of records written so far.
+
+    Methods:
+        write_rows: Append rows of field values to the file.
+        add_string: Add a string to the strings table and return its index.
+        close: Write the strings table and the header and close the file.
+    """
+
+    def __init__(self, path: str | Path, kind: str):
+        self.kind = kind
+        self.fields = SCHEMAS[kind]
+        self.records_count = 0
+        self._strings = {}
+        self._file = open(path, "wb")
+        self._file.write(bytes(HEADER.size))
+
+    def __enter__(self) -> "LoanStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write_rows(self, rows: Iterable[Iterable[float]]) -> None:
+        """
+        Append rows of field values to the file.
+
+        Args:
+            rows (Iterable[Iterable[float]]): The rows, each holding a value per field.
+
+        Returns:
+            None
+        """
+
+        values = array("d")
+        rows_count = 0
+        for row in rows:
+            values.extend(row)
+            rows_count += 1
+        if len(values) != rows_count * len(self.fields):
+            raise LoanStoreError(
+                f"Every {self.kind} row must have {len(self.fields)} values."
+            )
+        values.tofile(self._file)
+        self.records_count += rows_count
+
+    def add_string(self, value: str) -> int:
+        """
+        Add a string to the strings table and return its index.
+
+        Args:
+            value (str): The string, stored once however often it is added.
+
+        Returns:
+            int: The index of the string in the table.
+        """
+
+        return self._strings.setdefault(value, len(self._strings))
+
+    def close(self) -> None:
+        """
+        Write the strings table and the header and close the file.
+
+        Returns:
+            None
+        """
+
+        if self._file.closed:
+            return
+        self._file.write(STRING_LENGTH.pack(len(self._strings)))
+        for value in self._strings:
+            encoded = value.encode()
+            self._file.write(STRING_LENGTH.pack(len(encoded)) + encoded)
+        self._file.seek(0)
+        self._file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                KINDS.index(self.kind),
+                len(self.fields),
+                self.records_count,
+            )
+        )
+        self._file.close()
+
+
+class LoanStoreReader:
+    """
+    A reader memory-mapping a loan store file.
+
+    Attributes:
+        kind (str): The record kind, one of ``SCHEMAS``.
+        fields (tuple[str, ...]): The fields of a record.
+        records_count (int): The number of records in the file.
+        strings (list[str]): The strings table, indexed by the text fields.
+
+    Methods:
+        chunks: Yield zero-copy views over consecutive chunks of records.
+        iter_rows: Iterate over the records of a chunk as tuples.
+        close: Unmap and close the file.
+    """
+
+    def __init__(self, path: str | Path):
+        self._chunk_iterators = []
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise LoanStoreError(f"{path} is not a loan store file.")
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise LoanStoreError(f"{path} is not a loan store file.")
+        magic, version, kind, fields_count, records_count = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC:
+            self.close()
+            raise LoanStoreError(f"{path} is not a loan store file.")
+        if version != VERSION:
+            self.close()
+            raise LoanStoreError(f"Unsupported loan store version {version}.")
+
+        if kind >= len(KINDS) or fields_count != len(SCHEMAS[KINDS[kind]]):
+            self.close()
+            raise LoanStoreError(f"{path} has an unknown record layout.")
+
+        self.kind = KINDS[kind]
+        self.fields = SCHEMAS[self.kind]
+        self.records_count = records_count
+        self._record = struct.Struct(f"<{fields_count}d")
+        try:
+            self.strings = self._read_strings(
+                offset=HEADER.size + records_count * self._record.size
+            )
+        except struct.error:
+            self.close()
+            raise LoanStoreError(f"{path} is truncated.")
+
+    def __enter__(self) -> "LoanStoreReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def chunks(self, chunk_size: int) -> Iterator[memoryview]:
+        """
+        Yield zero-copy views over consecutive chunks of records.
+
+        Every view is a flat sequence of doubles, ``len(fields)`` per record, and is
+        released as soon as the next chunk is requested.
+
+        Args:
+            chunk_size (int): The maximum number of records per chunk.
+
+        Returns:
+            Iterator[memoryview]: The doubles of the records in every chunk.
+        """
+
+        chunks = self._iter_chunks(chunk_size)
+        self._chunk_iterators.append(chunks)
+        return chunks
+
+    def _iter_chunks(self, chunk_size: int) -> Iterator[memoryview]:
+        with memoryview(self._mmap) as buffer:
+            for start in range(0, self.records_count, chunk_size):
+                stop = min(start + chunk_size, self.records_count)
+                with buffer[
+                    HEADER.size
+                    + start * self._record.size : HEADER.size
+                    + stop * self._record.size
+                ].cast("d") as chunk:
+                    yield chunk
+
+    def iter_rows(self, chunk: memoryview) -> Iterator[tuple[float, ...]]:
+        """
+        Iterate over the records of a chunk as tuples.
+
+        Args:
+            chunk (memoryview): A chunk yielded by ``chunks``.
+
+        Returns:
+            Iterator[tuple[float, ...]]: The field values of every record.
+        """
+
+        return self._record.iter_unpack(chunk.cast("B"))
+
+    def _read_strings(self, offset: int) -> list[str]:
+        (strings_count,) = STRING_LENGTH.unpack_from(self._mmap, offset)
+        offset += STRING_LENGTH.size
+        strings = []
+        for _ in range(strings_count):
+            (length,) = STRING_LENGTH.unpack_from(self._mmap, offset)
+            offset += STRING_LENGTH.size
+            if offset + length > len(self._mmap):
+                raise struct.error("string out of bounds")
+            strings.append(self._mmap[offset : offset + length].decode())
+            offset += length
+        return strings
+
+    def close(self) -> None:
+        """
+        Unmap and close the file.
+
+        Returns:
+            None
+        """
+
+        # Views over the map must be released before it can be closed
+        for chunks in self._chunk_iterators:
+            chunks.close()
+        self._mmap.close()
+        self._file.close()
+
+
+class LoanStoreJobs:
+    """
+    A class to run batch jobs over loan store files in bounded memory.
+
+    Attributes:
+        None
+
+    Methods:
+        calculate: Calculate loan details for every record of an inputs file.
+        export_loans: Export the Loan table into a loans file.
+        import_loans: Import the records of a loans file into the Loan table.
+    """
+
+    @staticmethod
+    def calculate(
+        inputs_path: str | Path, results_path: str | Path, chunk_size: int
+    ) -> int:
+        """
+        Calculate loan details for every record of an inputs file.
+
+        Records that cannot be calculated, e.g. without any down payment, get NaN results.
+
+        Args:
+            inputs_path (str | Path): The path of the inputs file.
+            results_path (str | Path): The path of the results file to write.
+            chunk_size (int): The number of records processed at a time.
+
+        Returns:
+            int: The number of calculated records.
+        """
+
+        with LoanStoreReader(inputs_path) as reader, LoanStoreWriter(
+            results_path, kind="results"
+        ) as writer:
+            if reader.kind != "inputs":
+                raise LoanStoreError(f"Expected an inputs file, got {reader.kind}.")
+
+            failed = (math.nan,) * len(writer.fields)
+            for chunk in reader.chunks(chunk_size):
+                results = []
+                for (
+                    purchase_price,
+                    interest_rate,
+                    dollar_down_payment,
+                    percentage_down_payment,
+                    mortgage_term,
+                ) in reader.iter_rows(chunk):
+                    try:
+                        loan_details = LoanCalculator.calculate_loan(
+                            purchase_price=purchase_price,
+                            interest_rate=interest_rate,
+                            dollar_down_payment=(
+                                None
+                                if math.isnan(dollar_down_payment)
+                                else dollar_down_payment
+                            ),
+                            percentage_down_payment=(
+                                None
+                                if math.isnan(percentage_down_payment)
+                                else percentage_down_payment
+                            ),
+                            mortgage_term=mortgage_term,
+                        )
+                    except (ArithmeticError, TypeError):
+                        results.append(failed)
+                    else:
+                        results.append(
+                            (
+                                *loan_details,
+                                LoanCalculator.calculate_mortgage_term_in_years(
+                                    mortgage_term=mortgage_term
+                                ),
+                            )
+                        )
+                writer.write_rows(results)
+            return writer.records_count
+
+    @staticmethod
+    def export_loans(path: str | Path, chunk_size: int) -> int:
+        """
+        Export the Loan table into a loans file.
+
+        The loans of every shard are written one shard after another, each shard in
+        the order of its ids.
+
+        Args:
+            path (str | Path): The path of the loans file to write.
+            chunk_size (int): The number of loans fetched at a time.
+
+        Returns:
+            int: The number of exported loans.
+        """
+
+        fields = [
+            "client_id" if name == "client" else name for name in SCHEMAS["loans"]
+        ]
+        loans = (
+            loan
+            for using in LoanShards.get_aliases()
+            for loan in Loan.objects.using(using)
+            .order_by("id")
+            .values_list(*fields)
+            .iterator(chunk_size=chunk_size)
+        )
+        with LoanStoreWriter(path, kind="loans") as writer:
+            rows = []
+            for loan_id, created_at, updated_at, client_id, *values in loans:
+                rows.append(
+                    (
+                        loan_id,
+                        created_at.timestamp(),
+                        updated_at.timestamp(),
+                        writer.add_string(client_id),
+                        *(math.nan if value is None else value for value in values),
+                    )
+                )
+                if len(rows) == chunk_size:
+                    writer.write_rows(rows)
+                    rows = []
+            writer.write_rows(rows)
+            return writer.records_count
+
+    @staticmethod
+    def import_loans(path: str | Path, chunk_size: int) -> int:
+        """
+        Import the records of a loans file into the Loan table.
+
+        The loans get new primary keys and keep their client ids, timestamps and
+        derived columns. Every loan is written to the shard of its client id.
+
+        Args:
+            path (str | Path): The path of the loans file.
+            chunk_size (int): The number of loans inserted at a time.
+
+        Returns:
+            int: The number of imported loans.
+        """
+
+        tz = timezone.utc if settings.USE_TZ else None
+        imported = 0
+        with LoanStoreReader(path) as reader:
+            if reader.kind != "loans":
+                raise LoanStoreError(f"Expected a loans file, got {reader.kind}.")
+
+            for chunk in reader.chunks(chunk_size):
+                loans_by_shard = defaultdict(list)
+                for _, created_at, updated_at, client, *values in reader.iter_rows(
+                    chunk
+                ):
+                    client_id = reader.strings[int(client)]
+                    loans_by_shard[LoanShards.get_alias(client_id)].append(
+                        Loan(
+                            client_id=client_id,
+                            created_at=datetime.fromtimestamp(created_at, tz=tz),
+                            updated_at=datetime.fromtimestamp(updated_at, tz=tz),
+                            **{
+                                name: None if math.isnan(value) else value
+                                for name, value in zip(reader.fields[4:], values)
+                            },
+                        )
+                    )
+                for using, loans in loans_by_shard.items():
+                    Loan.objects.using(using).bulk_create(loans)
+                    imported += len(loans)
+        return imported
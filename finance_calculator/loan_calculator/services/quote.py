@@ -0,0 +1,55 @@
+from typing import Any
+
+from loan_calculator.serializers import LoanInputSerializer
+from loan_calculator.services.loan import LoanCalculator
+
+
+class QuoteService:
+    """
+    A class to calculate loan quotes without saving them.
+
+    Attributes:
+        None
+
+    Methods:
+        calculate_quote: Validate loan inputs and calculate the loan details.
+    """
+
+    @staticmethod
+    def calculate_quote(inputs: dict[str, Any]) -> dict[str, Any]:
+        """
+        Validate loan inputs and calculate the loan details.
+
+        Args:
+            inputs (dict[str, Any]): The loan inputs, as accepted by LoanInputSerializer.
+
+        Returns:
+            dict[str, Any]: A dictionary containing either the loan details or the validation errors.
+        """
+
+        serializer = LoanInputSerializer(data=inputs)
+        if not serializer.is_valid():
+            return {"errors": serializer.errors}
+
+        validated_data = serializer.validated_data
+        try:
+            (
+                total_amount,
+                monthly_payment,
+                total_over_loan_term,
+                total_interest_paid_over_loan_term,
+            ) = LoanCalculator.calculate_loan(**validated_data)
+        except (ArithmeticError, TypeError):
+            return {"errors": {"non_field_errors": ["Error! Invalid input arguments!"]}}
+
+        return {
+            "loan_details": {
+                "total_amount": total_amount,
+                "monthly_payment": monthly_payment,
+                "total_over_loan_term": total_over_loan_term,
+                "total_interest_paid_over_loan_term": total_interest_paid_over_loan_term,
+                "mortgage_term_in_years": LoanCalculator.calculate_mortgage_term_in_years(
+                    mortgage_term=validated_data["mortgage_term"]
+                ),
+            }
+        }
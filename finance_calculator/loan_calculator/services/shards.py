@@ -0,0 +1,212 @@
+import functools
+import heapq
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import cmp_to_key
+from itertools import islice
+from typing import Any, Callable, TypeVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import QuerySet
+
+from finance_calculator.config import sharding_config
+from loan_calculator.models import Loan
+
+T = TypeVar("T")
+
+
+@functools.cache
+def get_fan_out_executor(pid: int) -> ThreadPoolExecutor:
+    # Threads do not survive a fork, so every worker process gets its own pool
+    return ThreadPoolExecutor(
+        max_workers=sharding_config.FAN_OUT_WORKERS, thread_name_prefix="loan-shards"
+    )
+
+
+class LoanShards:
+    """
+    A class to pick the shard of a loan and to fan loan queries out over every shard.
+
+    A loan lives on the shard picked by a stable hash of its client id, so the loans of
+    a client stay together. Shards are taken modulo their count, so adding a shard
+    moves existing loans. Without configured shards, the default database is the
+    only shard and nothing runs in parallel.
+
+    Attributes:
+        None
+
+    Methods:
+        is_enabled: Check whether loans are spread over several databases.
+        get_aliases: Return the database aliases holding loans.
+        get_alias: Return the database alias holding the loans of a client.
+        fan_out: Call a function for every database alias in parallel.
+        fan_out_queryset: Run a query against every database holding its rows in parallel.
+        fetch: Fetch the rows of a queryset from every shard in its order.
+    """
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Check whether loans are spread over several databases.
+
+        Returns:
+            bool: True if loan shards are configured.
+        """
+
+        return bool(settings.LOAN_SHARDS)
+
+    @staticmethod
+    def get_aliases() -> list[str]:
+        """
+        Return the database aliases holding loans.
+
+        Returns:
+            list[str]: The aliases of the shards, or the default alias without shards.
+        """
+
+        return list(settings.LOAN_SHARDS) or [DEFAULT_DB_ALIAS]
+
+    @classmethod
+    def get_alias(cls, client_id: str) -> str:
+        """
+        Return the database alias holding the loans of a client.
+
+        Args:
+            client_id (str): The client id of the loan.
+
+        Returns:
+            str: The alias of the shard of the client.
+        """
+
+        aliases = cls.get_aliases()
+        # Unlike hash(), crc32 is the same in every worker process
+        return aliases[zlib.crc32(client_id.encode()) % len(aliases)]
+
+    @staticmethod
+    def fan_out(function: Callable[[str], T], aliases: list[str]) -> list[T]:
+        """
+        Call a function for every database alias in parallel.
+
+        The calls run on a pool of threads shared by the requests of the process. Like
+        a request thread, a pool thread keeps its connections across calls and only
+        closes them after errors or once they are older than ``CONN_MAX_AGE``. The
+        execute wrappers installed on the connections of the
+        calling thread are installed on the connections of the threads as well, so
+        the queries of the calls are still timed and counted. A single alias is served
+        inline by the current connection.
+
+        Args:
+            function (Callable[[str], T]): The function taking a database alias.
+            aliases (list[str]): The database aliases.
+
+        Returns:
+            list[T]: The results of the function in the order of the aliases.
+        """
+
+        if len(aliases) == 1:
+            return [function(aliases[0])]
+
+        wrappers = {
+            alias: list(connections[alias].execute_wrappers) for alias in aliases
+        }
+
+        def run(alias: str) -> T:
+            connection = connections[alias]
+            try:
+                with ExitStack() as stack:
+                    for wrapper in wrappers[alias]:
+                        stack.enter_context(connection.execute_wrapper(wrapper))
+                    return function(alias)
+            finally:
+                connection.close_if_unusable_or_obsolete()
+
+        return list(get_fan_out_executor(os.getpid()).map(run, aliases))
+
+    @classmethod
+    def fan_out_queryset(
+        cls, queryset: QuerySet, fetch: Callable[[QuerySet], T]
+    ) -> list[T]:
+        """
+        Run a query against every database holding its rows in parallel.
+
+        Loan querysets run against every shard, others against their own database.
+
+        Args:
+            queryset (QuerySet): The queryset to run.
+            fetch (Callable[[QuerySet], T]): The function evaluating the queryset of a database.
+
+        Returns:
+            list[T]: The results of every database.
+        """
+
+        if queryset.model is Loan and cls.is_enabled():
+            aliases = cls.get_aliases()
+        else:
+            aliases = [queryset.db]
+        return cls.fan_out(lambda alias: fetch(queryset.using(alias)), aliases)
+
+    @classmethod
+    def fetch(cls, queryset: QuerySet, limit: int | None = None) -> list[Any]:
+        """
+        Fetch the rows of a queryset from every shard in its order.
+
+        Every shard returns at most ``limit`` rows already ordered, and the results
+        are merged on every ordering field, so the first rows over all the shards
+        are fetched without sorting them again. The primary key is added as the last
+        ordering field, so rows tied on the others come in the same order from every
+        shard and every page.
+
+        Args:
+            queryset (QuerySet): The ordered queryset of model instances or dictionaries.
+            limit (int | None): The maximum number of rows to return.
+
+        Returns:
+            list[Any]: The merged rows.
+        """
+
+        ordering = list(queryset.query.order_by)
+        pk_name = queryset.model._meta.pk.name
+        if not {pk_name, "pk"} & {field.lstrip("-") for field in ordering}:
+            ordering.append(f"-{pk_name}" if ordering[0].startswith("-") else pk_name)
+            queryset = queryset.order_by(*ordering)
+        ordering = [
+            (
+                pk_name if field.lstrip("-") == "pk" else field.lstrip("-"),
+                field[0] == "-",
+            )
+            for field in ordering
+        ]
+        missing_fields = [
+            field_name
+            for field_name, _ in ordering
+            if queryset._fields and field_name not in queryset._fields
+        ]
+        if missing_fields:
+            # The merge needs the ordering fields even if they were not projected
+            queryset = queryset.values(*queryset._fields, *missing_fields)
+
+        results = cls.fan_out_queryset(
+            queryset, lambda shard_queryset: list(shard_queryset[:limit])
+        )
+        if len(results) == 1:
+            return results[0]
+
+        def get_key(row, field_name):
+            value = (
+                row[field_name] if isinstance(row, dict) else getattr(row, field_name)
+            )
+            return value is not None, value
+
+        def compare(row, other):
+            for field_name, descending in ordering:
+                key, other_key = get_key(row, field_name), get_key(other, field_name)
+                if key != other_key:
+                    result = 1 if key > other_key else -1
+                    return -result if descending else result
+            return 0
+
+        merged = heapq.merge(*results, key=cmp_to_key(compare))
+        return list(islice(merged, limit))
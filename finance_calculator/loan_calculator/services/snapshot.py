@@ -0,0 +1,155 @@
+import threading
+import time
+from array import array
+
+from django.db.models import QuerySet
+
+from finance_calculator.config import snapshot_config
+from loan_calculator.models import Loan
+from loan_calculator.services.shards import LoanShards
+
+
+class LoanSnapshot:
+    """
+    A read-optimized, columnar in-memory copy of the Loan numeric columns.
+
+    Every column is a contiguous typed array, so a loan takes 56 bytes instead of a
+    model instance. The snapshot is refreshed incrementally: rows with an id above the
+    watermark are appended, and it is rebuilt when a loaded row was updated since,
+    which the ``updated_at`` index finds without scanning the table. Deleted rows
+    leave no trace in the index, so the loaded rows are recounted at most every
+    ``RECOUNT_SECONDS``. Within ``TTL_SECONDS`` of the last refresh, the snapshot is
+    served without checking the database at all.
+
+    Attributes:
+        using (str): The database alias the loans are loaded from.
+        lock (threading.Lock): Held while the snapshot is refreshed; hold it to read consistent columns.
+        COLUMNS (tuple[str, ...]): The numeric Loan columns held by the snapshot.
+        CHUNK_SIZE (int): The number of rows fetched per database round trip.
+
+    Methods:
+        refresh: Load the loans changed since the last refresh.
+        column: Return the values of a numeric column.
+        nbytes: Return the memory used by the snapshot arrays.
+    """
+
+    COLUMNS = (
+        "total_amount",
+        "total_over_loan_term",
+        "monthly_payment",
+        "interest_rate",
+        "mortgage_term",
+    )
+    CHUNK_SIZE = 2000
+
+    def __init__(self, using: str = "default"):
+        self.using = using
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def refresh(self) -> int:
+        """
+        Load the loans changed since the last refresh.
+
+        Returns:
+            int: The number of loaded rows, zero when the snapshot is still fresh.
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            if (
+                self.checked_at is not None
+                and now - self.checked_at < snapshot_config.TTL_SECONDS
+            ):
+                return 0
+            self.checked_at = now
+
+            loans = Loan.objects.using(self.using)
+            if self.ids and self._is_outdated(loans=loans, now=now):
+                self._reset()
+
+            rows = (
+                loans.filter(id__gt=self.watermark)
+                .order_by("id")
+                .values_list("id", "created_at", "updated_at", *self.COLUMNS)
+                .iterator(chunk_size=self.CHUNK_SIZE)
+            )
+            columns = [self.columns[name] for name in self.COLUMNS]
+            loaded_rows = 0
+            for loan_id, created_at, updated_at, *values in rows:
+                self.ids.append(loan_id)
+                self.created_at.append(created_at.timestamp())
+                for column, value in zip(columns, values):
+                    column.append(value)
+                if self.last_updated_at is None or updated_at > self.last_updated_at:
+                    self.last_updated_at = updated_at
+                loaded_rows += 1
+
+            if self.ids:
+                self.watermark = self.ids[-1]
+            return loaded_rows
+
+    def column(self, name: str) -> array:
+        """
+        Return the values of a numeric column.
+
+        Args:
+            name (str): The name of the Loan column.
+
+        Returns:
+            array: The column values ordered by loan id.
+        """
+
+        return self.columns[name]
+
+    def nbytes(self) -> int:
+        """
+        Return the memory used by the snapshot arrays.
+
+        Returns:
+            int: The size of the array buffers in bytes.
+        """
+
+        arrays = [self.ids, self.created_at, *self.columns.values()]
+        return sum(len(values) * values.itemsize for values in arrays)
+
+    def _is_outdated(self, loans: QuerySet, now: float) -> bool:
+        loaded = loans.filter(id__lte=self.watermark)
+        if loaded.filter(updated_at__gt=self.last_updated_at).exists():
+            return True
+        if now - self.counted_at < snapshot_config.RECOUNT_SECONDS:
+            return False
+        self.counted_at = now
+        return loaded.count() != len(self.ids)
+
+    def _reset(self) -> None:
+        self.ids = array("q")
+        self.created_at = array("d")  # POSIX timestamps
+        self.columns = {name: array("d") for name in self.COLUMNS}
+        self.watermark = 0
+        self.last_updated_at = None
+        self.counted_at = time.monotonic()
+
+
+loan_snapshot = LoanSnapshot()
+shard_snapshots = {}
+
+
+def get_loan_snapshots() -> dict[str, LoanSnapshot]:
+    """
+    Return the snapshot of every database holding loans.
+
+    Returns:
+        dict[str, LoanSnapshot]: The snapshots by database alias.
+    """
+
+    if not LoanShards.is_enabled():
+        return {"default": loan_snapshot}
+    for alias in LoanShards.get_aliases():
+        if alias not in shard_snapshots:
+            shard_snapshots[alias] = LoanSnapshot(using=alias)
+    return {alias: shard_snapshots[alias] for alias in LoanShards.get_aliases()}
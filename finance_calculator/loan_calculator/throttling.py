@@ -0,0 +1,197 @@
+import functools
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from finance_calculator.config import rate_limit_config
+
+logger = logging.getLogger(__name__)
+
+
+def refill_and_take(
+    tokens: float, updated_at: float, now: float, capacity: float, refill_rate: float
+) -> tuple[float, float]:
+    """
+    Refill a token bucket for the elapsed time and try to take a token from it.
+
+    Args:
+        tokens (float): The tokens left in the bucket at ``updated_at``.
+        updated_at (float): The time the bucket was last updated, in seconds.
+        now (float): The current time, in seconds.
+        capacity (float): The maximum number of tokens, i.e. the allowed burst.
+        refill_rate (float): The number of tokens added per second.
+
+    Returns:
+        tuple[float, float]: The tokens left and the seconds to wait before a token is
+            available, zero if a token was taken.
+    """
+
+    tokens = min(capacity, tokens + max(now - updated_at, 0) * refill_rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / refill_rate
+
+
+class InProcessTokenBucketStore:
+    """
+    A token bucket store kept in the memory of a single worker process.
+
+    Buckets that refilled completely are forgotten once ``max_clients`` buckets are held.
+    """
+
+    def __init__(self, max_clients: int):
+        self.max_clients = max_clients
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: float, refill_rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens, wait = refill_and_take(
+                tokens, updated_at, now, capacity, refill_rate
+            )
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._prune(now, capacity, refill_rate)
+        return wait
+
+    def _prune(self, now: float, capacity: float, refill_rate: float) -> None:
+        self._buckets = {
+            key: (tokens, updated_at)
+            for key, (tokens, updated_at) in self._buckets.items()
+            if tokens + (now - updated_at) * refill_rate < capacity
+        }
+
+
+class SqliteTokenBucketStore:
+    """
+    A token bucket store in a local SQLite file, shared by every worker on the host.
+
+    Each take runs in an immediate transaction, so concurrent workers never spend the
+    same token twice.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def consume(self, key: str, capacity: float, refill_rate: float) -> float:
+        connection = self._get_connection()
+        now = time.time()
+        try:
+            return self._consume(connection, key, capacity, refill_rate, now)
+        except sqlite3.OperationalError as exc:
+            # The store is locked past its timeout while workers contend for it; the
+            # request is let through rather than failed, load shedding still applies
+            logger.warning("Token bucket store unavailable, not throttling: %s", exc)
+            return 0.0
+
+    def _consume(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        capacity: float,
+        refill_rate: float,
+        now: float,
+    ) -> float:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM token_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row or (capacity, now)
+            tokens, wait = refill_and_take(
+                tokens, updated_at, now, capacity, refill_rate
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at) "
+                "VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        try:
+            connection.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+
+        self._local.takes += 1
+        if self._local.takes >= self.PRUNE_EVERY:
+            # Buckets untouched for longer than a full refill hold `capacity` tokens,
+            # the same as a missing bucket
+            self._local.takes = 0
+            try:
+                connection.execute(
+                    "DELETE FROM token_buckets WHERE updated_at < ?",
+                    (now - capacity / refill_rate,),
+                )
+            except sqlite3.OperationalError:
+                # The token was taken already, pruning is retried on a later take
+                pass
+        return wait
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+            self._local.takes = 0
+        return connection
+
+
+@functools.cache
+def get_token_bucket_store() -> InProcessTokenBucketStore | SqliteTokenBucketStore:
+    if rate_limit_config.BACKEND == "sqlite":
+        return SqliteTokenBucketStore(path=rate_limit_config.SQLITE_PATH)
+    return InProcessTokenBucketStore(max_clients=rate_limit_config.MAX_CLIENTS)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    A throttle limiting writes per client with a token bucket.
+
+    Clients sending one of the configured ``API_KEYS`` in their X-Api-Key header are
+    identified by it; any other client is identified by its address, as unknown keys
+    could be changed on every request. Safe methods are never throttled, and views
+    only apply the throttle to the actions writing to the database.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view) -> bool:
+        if request.method in SAFE_METHODS:
+            return True
+
+        self.wait_seconds = get_token_bucket_store().consume(
+            key=self.get_client_key(request),
+            capacity=rate_limit_config.CAPACITY,
+            refill_rate=rate_limit_config.REFILL_PER_SECOND,
+        )
+        return self.wait_seconds == 0
+
+    def get_client_key(self, request) -> str:
+        api_key = request.META.get(rate_limit_config.API_KEY_HEADER)
+        if api_key in rate_limit_config.API_KEYS:
+            # Buckets may be stored on disk, so they never hold the key itself
+            return f"key:{hashlib.sha256(api_key.encode()).hexdigest()}"
+        return f"ip:{self.get_ident(request)}"
+
+    def wait(self) -> float | None:
+        return self.wait_seconds
@@ -1,13 +1,26 @@
 from django.db.models import F
-from rest_framework import mixins, status, viewsets
+from django.utils.cache import get_conditional_response
+from rest_framework import filters, mixins, serializers, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from loan_calculator.models import Loan
+from finance_calculator.config import idempotency_config, sharding_config
+from loan_calculator.filters import KeysetFilterBackend, RangeFilterBackend
+from loan_calculator.models import ArchivedLoan, Loan
 from loan_calculator.serializers import (
+    AffordabilityInputSerializer,
+    ArchivedLoanOutputSerializer,
     LoanInputSerializer,
-    LoanOutputSerializer
+    LoanOutputSerializer,
 )
+from loan_calculator.services.affordability import AffordabilityCalculator
+from loan_calculator.services.analytics import LoanAnalytics
+from loan_calculator.services.conditional import ConditionalGet
+from loan_calculator.services.idempotency import IdempotencyService
 from loan_calculator.services.loan import LoanCalculator
+from loan_calculator.services.shards import LoanShards
+from loan_calculator.services.snapshot import get_loan_snapshots
+from loan_calculator.throttling import TokenBucketThrottle
 
 
 class LoanViewSet(
@@ -15,32 +28,168 @@ class LoanViewSet(
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
 ):
-    serializer_map = {"list": LoanOutputSerializer, "create": LoanInputSerializer}
+    serializer_map = {
+        "list": LoanOutputSerializer,
+        "create": LoanInputSerializer,
+        "affordability": AffordabilityInputSerializer,
+    }
     ordering_fields = "__all__"
+    # Only these actions write to the database, so only they are throttled and shed
+    db_write_actions = {"create"}
+    throttle_classes = [TokenBucketThrottle]
+    filter_backends = [RangeFilterBackend, KeysetFilterBackend, filters.OrderingFilter]
+    range_filter_fields = {
+        "total_amount": serializers.FloatField(),
+        "interest_rate": serializers.FloatField(),
+        "mortgage_term": serializers.FloatField(),
+        "created_at": serializers.DateTimeField(),
+    }
 
     def get_serializer_class(self):
+        if self.action == "list" and self.is_archive_requested():
+            return ArchivedLoanOutputSerializer
         return self.serializer_map.get(self.action, None)
 
+    def get_throttles(self):
+        if self.action not in self.db_write_actions:
+            return []
+        return super().get_throttles()
+
     def get_queryset(self):
-        qs = Loan.objects.all()
-        return qs.order_by('-created_at')
+        model = ArchivedLoan if self.is_archive_requested() else Loan
+        qs = model.objects.all()
+        return qs.order_by("-created_at", "-id")
+
+    def is_archive_requested(self):
+        archived = self.request.query_params.get("archived")
+        if archived is None:
+            return False
+
+        try:
+            return serializers.BooleanField().to_internal_value(archived)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"archived": exc.detail})
+
+    def get_projected_fields(self):
+        fields = self.request.query_params.get("fields")
+        if not fields:
+            return None
+
+        fields = fields.split(",")
+        available_fields = set(self.get_serializer_class()().fields)
+        unknown_fields = [field for field in fields if field not in available_fields]
+        if unknown_fields:
+            raise serializers.ValidationError(
+                {"fields": [f"Unknown field '{field}'." for field in unknown_fields]}
+            )
+        return fields
+
+    def get_limit(self):
+        limit = self.request.query_params.get("limit")
+        if limit is None:
+            return None
+
+        try:
+            return serializers.IntegerField(min_value=1).run_validation(limit)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"limit": exc.detail})
+
+    def get_client_id(self):
+        client_id = self.request.META.get(sharding_config.CLIENT_ID_HEADER, "")
+        if len(client_id) > sharding_config.CLIENT_ID_MAX_LENGTH:
+            raise serializers.ValidationError(
+                {
+                    "X-Client-Id": [
+                        f"Ensure this header has no more than "
+                        f"{sharding_config.CLIENT_ID_MAX_LENGTH} characters."
+                    ]
+                }
+            )
+        return client_id
+
+    def get_idempotency_key(self):
+        key = self.request.META.get(idempotency_config.HEADER)
+        if key and len(key) > idempotency_config.KEY_MAX_LENGTH:
+            raise serializers.ValidationError(
+                {
+                    "Idempotency-Key": [
+                        f"Ensure this header has no more than "
+                        f"{idempotency_config.KEY_MAX_LENGTH} characters."
+                    ]
+                }
+            )
+        return key
 
     def list(self, request, *args, **kwargs):
+        fields = self.get_projected_fields()
+        limit = self.get_limit()
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = ConditionalGet.get_etag(
+            queryset=queryset, full_path=request.get_full_path()
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified.headers["ETag"] = etag
+            return not_modified
+
+        if fields is not None:
+            queryset = queryset.values(*fields)
+        loans = LoanShards.fetch(queryset, limit=limit)
+        serializer = self.get_serializer(loans, many=True, fields=fields)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        response.headers["ETag"] = etag
+        return response
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         validated_data = serializer.validated_data
+        client_id = self.get_client_id()
+
+        def calculate_and_save_loan():
+            return LoanCalculator.calculate_and_save_loan(
+                purchase_price=validated_data["purchase_price"],
+                interest_rate=validated_data["interest_rate"],
+                dollar_down_payment=validated_data["dollar_down_payment"],
+                percentage_down_payment=validated_data["percentage_down_payment"],
+                mortgage_term=validated_data["mortgage_term"],
+                client_id=client_id,
+            )
+
+        idempotency_key = self.get_idempotency_key()
+        if not idempotency_key:
+            response = calculate_and_save_loan()
+            return Response(response["data"], status=response["status"])
 
-        response = LoanCalculator.calculate_and_save_loan(
-            purchase_price=validated_data["purchase_price"],
-            interest_rate=validated_data["interest_rate"],
-            dollar_down_payment=validated_data["dollar_down_payment"],
-            percentage_down_payment=validated_data["percentage_down_payment"],
-            mortgage_term=validated_data["mortgage_term"],
+        response = IdempotencyService.replay_or_execute(
+            key=idempotency_key,
+            request_data=validated_data,
+            execute=calculate_and_save_loan,
+            using=LoanShards.get_alias(client_id),
         )
-        return Response(response["data"], status=response["status"])
+        headers = {"Idempotent-Replayed": "true"} if response["replayed"] else None
+        return Response(response["data"], status=response["status"], headers=headers)
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request, *args, **kwargs):
+        snapshots = get_loan_snapshots()
+        LoanShards.fan_out(lambda alias: snapshots[alias].refresh(), list(snapshots))
+        summary = LoanAnalytics.summarize(*snapshots.values())
+        return Response(summary, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"])
+    def affordability(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+
+        if many:
+            response = AffordabilityCalculator.calculate_max_purchase_prices(
+                serializer.validated_data
+            )
+        else:
+            response = AffordabilityCalculator.calculate_max_purchase_price(
+                **serializer.validated_data
+            )
+        return Response(response, status=status.HTTP_200_OK)
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from loan_calculator.services.shards import get_fan_out_executor
+from loan_calculator.services.snapshot import shard_snapshots
+
+SHARDS = ["loans_0", "loans_1", "loans_2"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshots(monkeypatch):
+    # The snapshots outlive the test database, so every refresh checks it in full
+    monkeypatch.setattr(
+        "loan_calculator.services.snapshot.snapshot_config.TTL_SECONDS", 0
+    )
+    monkeypatch.setattr(
+        "loan_calculator.services.snapshot.snapshot_config.RECOUNT_SECONDS", 0
+    )
+
+
+@pytest.fixture
+def loan_shards(tmp_path, settings, django_db_blocker):
+    # Every shard is a SQLite file migrated with the loan table only
+    for alias in SHARDS:
+        connections.settings[alias] = {
+            **connections.settings["default"],
+            "NAME": str(tmp_path / f"{alias}.sqlite3"),
+        }
+    settings.LOAN_SHARDS = SHARDS
+
+    with django_db_blocker.unblock():
+        for alias in SHARDS:
+            call_command("migrate", database=alias, verbosity=0)
+        yield SHARDS
+
+        shard_snapshots.clear()
+        # Pool threads keep connections to this test's shard files
+        get_fan_out_executor(os.getpid()).shutdown()
+        get_fan_out_executor.cache_clear()
+        for alias in SHARDS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
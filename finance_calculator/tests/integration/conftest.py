@@ -1,6 +1,7 @@
 import pytest
 
 from loan_calculator.models import Loan
+from tests.integration.query_budget import QueryBudget
 
 
 @pytest.fixture
@@ -19,3 +20,8 @@ def test_loan_obj(test_loan_data):
     loan = Loan.objects.create(**test_loan_data)
     yield loan
     loan.delete()
+
+
+@pytest.fixture
+def query_budget():
+    return QueryBudget
@@ -0,0 +1,140 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from loan_calculator.services.shards import LoanShards
+
+# Literals are masked so that queries differing only by their parameters look the same
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryBudget:
+    """
+    A context manager failing the test when a block exceeds its query budget.
+
+    The budget bounds the number of queries, the number of rows fetched by them and
+    the wall time of the block. When a bound is exceeded, the test fails with every
+    executed query, its fetched rows and time. Queries repeating an earlier one up to
+    its literals, the usual sign of a per-row (N+1) query, are shown as a diff against
+    the distinct queries.
+
+    The queries of the default database and of every loan shard count against the
+    budget, including the ones fanned out to other threads.
+
+    Attributes:
+        queries (list[dict]): The executed queries with their ``alias``, ``sql``, ``rows`` and ``ms``.
+        elapsed_ms (float): The wall time of the block.
+
+    Methods:
+        report: Describe the executed queries.
+    """
+
+    def __init__(
+        self,
+        max_queries: int | None = None,
+        max_rows: int | None = None,
+        max_ms: float | None = None,
+    ):
+        self.max_queries = max_queries
+        self.max_rows = max_rows
+        self.max_ms = max_ms
+        self.queries = []
+        self.elapsed_ms = 0.0
+
+    def __enter__(self) -> "QueryBudget":
+        self._wrappers = ExitStack()
+        for alias in {DEFAULT_DB_ALIAS, *LoanShards.get_aliases()}:
+            self._wrappers.enter_context(
+                connections[alias].execute_wrapper(self._record)
+            )
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.elapsed_ms = (time.perf_counter() - self._started_at) * 1000
+        self._wrappers.close()
+        if exc_type is not None:
+            return
+
+        rows = sum(query["rows"] for query in self.queries)
+        exceeded = [
+            f"{name} {value:g} > {bound:g}"
+            for name, value, bound in (
+                ("queries", len(self.queries), self.max_queries),
+                ("rows fetched", rows, self.max_rows),
+                ("response time (ms)", self.elapsed_ms, self.max_ms),
+            )
+            if bound is not None and value > bound
+        ]
+        if exceeded:
+            pytest.fail(
+                f"Query budget exceeded: {', '.join(exceeded)}\n{self.report()}",
+                pytrace=False,
+            )
+
+    def report(self) -> str:
+        """
+        Describe the executed queries.
+
+        Every query is prefixed with ``+`` when it repeats an earlier query up to its
+        literals, and with two spaces otherwise.
+
+        Returns:
+            str: A line per query with its fetched rows, time and SQL.
+        """
+
+        seen = Counter()
+        lines = []
+        for number, query in enumerate(self.queries, start=1):
+            shape = LITERAL.sub("?", query["sql"])
+            marker = "+" if seen[shape] else " "
+            seen[shape] += 1
+            lines.append(
+                f"{marker} {number:>3}. [{query['alias']}, {query['rows']} rows, "
+                f"{query['ms']:.2f}ms] {query['sql']}"
+            )
+        repeated = sum(count - 1 for count in seen.values())
+        lines.append(
+            f"{len(self.queries)} queries, {len(seen)} distinct, {repeated} repeated"
+        )
+        return "\n".join(lines)
+
+    def _record(self, execute, sql, params, many, context):
+        connection = context["connection"]
+        query = {"alias": connection.alias, "sql": sql, "rows": 0, "ms": 0.0}
+        self.queries.append(query)
+        cursor = context["cursor"]
+        self._count_fetched_rows(cursor, query)
+
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            query["ms"] = (time.perf_counter() - started_at) * 1000
+            query["sql"] = connection.ops.last_executed_query(
+                cursor.cursor, sql, params
+            )
+
+    @staticmethod
+    def _count_fetched_rows(cursor, query: dict) -> None:
+        # The cursor wrapper delegates fetches to the database cursor, so counting
+        # methods set on the instance take precedence
+        cursor.query_budget_query = query
+        if "fetchone" in vars(cursor):
+            return
+
+        def count(fetch, rows_of):
+            def counting_fetch(*args, **kwargs):
+                result = fetch(*args, **kwargs)
+                cursor.query_budget_query["rows"] += rows_of(result)
+                return result
+
+            return counting_fetch
+
+        cursor.fetchone = count(cursor.fetchone, lambda row: row is not None)
+        cursor.fetchmany = count(cursor.fetchmany, len)
+        cursor.fetchall = count(cursor.fetchall, len)
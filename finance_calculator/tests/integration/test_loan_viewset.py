@@ -1,8 +1,14 @@
+from datetime import datetime
+
 import pytest
 from django.http import HttpResponseNotFound
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from loan_calculator.models import ArchivedLoan, Loan
+from loan_calculator.throttling import get_token_bucket_store
+
 
 @pytest.mark.django_db
 class TestLoanViewSet:
@@ -128,3 +134,322 @@ class TestLoanViewSet:
         assert (
             response.data["mortgage_term"][0].title() == "This Field May Not Be Null."
         )
+
+    def test_generate_rates_idempotent_replay(self):
+        data = {
+            "purchase_price": 100000,
+            "interest_rate": 5.0,
+            "dollar_down_payment": 20000,
+            "percentage_down_payment": None,
+            "mortgage_term": 360,
+        }
+
+        first = self.client.post(
+            self.loans_url, data=data, format="json", HTTP_IDEMPOTENCY_KEY="abc"
+        )
+        second = self.client.post(
+            self.loans_url, data=data, format="json", HTTP_IDEMPOTENCY_KEY="abc"
+        )
+
+        assert first.status_code == status.HTTP_201_CREATED
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.data == first.data
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert Loan.objects.count() == 1
+
+    def test_generate_rates_idempotency_key_reused(self):
+        data = {
+            "purchase_price": 100000,
+            "interest_rate": 5.0,
+            "dollar_down_payment": 20000,
+            "percentage_down_payment": None,
+            "mortgage_term": 360,
+        }
+
+        self.client.post(
+            self.loans_url, data=data, format="json", HTTP_IDEMPOTENCY_KEY="abc"
+        )
+        response = self.client.post(
+            self.loans_url,
+            data={**data, "purchase_price": 200000},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="abc",
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert Loan.objects.count() == 1
+
+    def test_generate_rates_idempotency_key_too_long(self):
+        data = {
+            "purchase_price": 100000,
+            "interest_rate": 5.0,
+            "dollar_down_payment": 20000,
+            "percentage_down_payment": None,
+            "mortgage_term": 360,
+        }
+
+        response = self.client.post(
+            self.loans_url, data=data, format="json", HTTP_IDEMPOTENCY_KEY="k" * 256
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Idempotency-Key" in response.data
+        assert Loan.objects.count() == 0
+
+    def test_list_loans_not_modified(self, test_loan_obj):
+        response = self.client.get(self.loans_url)
+        etag = response.headers["ETag"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Last-Modified" not in response.headers
+
+        response = self.client.get(self.loans_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+
+    def test_list_loans_modified(self, test_loan_data, test_loan_obj):
+        etag = self.client.get(self.loans_url).headers["ETag"]
+        Loan.objects.create(**test_loan_data)
+
+        response = self.client.get(self.loans_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert len(response.data) == 2
+
+    def test_list_loans_if_modified_since_ignored(self, test_loan_data, test_loan_obj):
+        # Dates only have a resolution of seconds, so only the ETag is a validator
+        Loan.objects.create(**test_loan_data)
+
+        response = self.client.get(
+            self.loans_url,
+            HTTP_IF_MODIFIED_SINCE=http_date(test_loan_obj.updated_at.timestamp() + 1),
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+
+    def test_list_loans_gzip(self, test_loan_data):
+        Loan.objects.bulk_create(Loan(**test_loan_data) for _ in range(10))
+
+        response = self.client.get(self.loans_url, HTTP_ACCEPT_ENCODING="gzip")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Content-Encoding"] == "gzip"
+
+    def test_list_loans_range_filter(self, test_loan_data):
+        Loan.objects.create(**{**test_loan_data, "total_amount": 50000})
+        Loan.objects.create(**{**test_loan_data, "total_amount": 150000})
+        Loan.objects.create(**{**test_loan_data, "total_amount": 250000})
+
+        response = self.client.get(
+            self.loans_url, {"total_amount_min": 100000, "total_amount_max": 200000}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert response.data[0]["total_amount"] == 150000
+
+    def test_list_loans_range_filter_bad_request(self):
+        response = self.client.get(self.loans_url, {"created_at_min": "yesterday"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "created_at_min" in response.data
+
+    def test_list_loans_keyset_cursor(self, test_loan_data):
+        created_at = datetime(2024, 1, 1)
+        loans = [
+            Loan.objects.create(**test_loan_data, created_at=created_at)
+            for _ in range(3)
+        ]
+
+        response = self.client.get(
+            self.loans_url,
+            {"created_at_before": created_at.isoformat(), "id_before": loans[2].id},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [loan["id"] for loan in response.data] == [loans[1].id, loans[0].id]
+
+    def test_list_loans_keyset_cursor_bad_request(self):
+        response = self.client.get(
+            self.loans_url, {"id_before": 1, "ordering": "total_amount"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {"id_before", "ordering"}
+
+    def test_list_loans_fields_projection(self, test_loan_data, test_loan_obj):
+        response = self.client.get(
+            self.loans_url, {"fields": "id,total_amount,created_at"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data[0]) == {"id", "total_amount", "created_at"}
+        assert response.data[0]["total_amount"] == test_loan_data["total_amount"]
+
+    def test_list_loans_fields_projection_unknown_field(self):
+        response = self.client.get(self.loans_url, {"fields": "total_amount,secret"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["fields"] == ["Unknown field 'secret'."]
+
+    def test_list_archived_loans(self, test_loan_data, test_loan_obj):
+        ArchivedLoan.objects.create(
+            **test_loan_data, loan_id=test_loan_obj.id + 1, period="2020-01-01"
+        )
+
+        response = self.client.get(self.loans_url, {"archived": "true"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+        assert response.data[0]["loan_id"] == test_loan_obj.id + 1
+        assert "period" not in response.data[0]
+        assert "shard" not in response.data[0]
+
+    def test_list_archived_loans_bad_request(self):
+        response = self.client.get(self.loans_url, {"archived": "maybe"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "archived" in response.data
+
+    def test_loans_summary(self, test_loan_data, test_loan_obj):
+        Loan.objects.create(**{**test_loan_data, "total_amount": 50000})
+
+        response = self.client.get(f"{self.loans_url}summary/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
+        assert response.data["total_amount"]["sum"] == 150000
+        assert response.data["total_amount"]["avg"] == 75000
+
+    def test_affordability(self):
+        data = {
+            "monthly_budget": 3000,
+            "interest_rate": 6.5,
+            "dollar_down_payment": None,
+            "percentage_down_payment": 20,
+            "mortgage_term": 360,
+            "annual_property_tax_rate": 1.2,
+        }
+
+        response = self.client.post(
+            f"{self.loans_url}affordability/", data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["max_purchase_price"] > 0
+        assert response.data["monthly_insurance"] == 0
+        assert Loan.objects.count() == 0
+
+    def test_affordability_round_trip_percentage(self):
+        affordability = self.client.post(
+            f"{self.loans_url}affordability/",
+            data={
+                "monthly_budget": 2000,
+                "interest_rate": 6.5,
+                "dollar_down_payment": None,
+                "percentage_down_payment": 20,
+                "mortgage_term": 360,
+            },
+            format="json",
+        ).data
+
+        response = self.client.post(
+            self.loans_url,
+            data={
+                "purchase_price": affordability["max_purchase_price"],
+                "interest_rate": 6.5,
+                "dollar_down_payment": None,
+                "percentage_down_payment": 20,
+                "mortgage_term": 360,
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["total_amount"] == pytest.approx(
+            affordability["loan_amount"], abs=0.05
+        )
+        assert response.data["monthly_payment"] == pytest.approx(2000, abs=0.05)
+
+    def test_affordability_batch(self):
+        data = [
+            {
+                "monthly_budget": budget,
+                "interest_rate": 6.5,
+                "dollar_down_payment": 20000,
+                "percentage_down_payment": None,
+                "mortgage_term": 360,
+            }
+            for budget in (1000, 2000)
+        ]
+
+        response = self.client.post(
+            f"{self.loans_url}affordability/", data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+        assert (
+            response.data[0]["max_purchase_price"]
+            < response.data[1]["max_purchase_price"]
+        )
+
+    def test_affordability_no_down_payment(self):
+        data = {
+            "monthly_budget": 3000,
+            "interest_rate": 6.5,
+            "dollar_down_payment": None,
+            "percentage_down_payment": None,
+            "mortgage_term": 360,
+        }
+
+        response = self.client.post(
+            f"{self.loans_url}affordability/", data=data, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "non_field_errors" in response.data
+
+    def test_generate_rates_throttled(self, monkeypatch):
+        monkeypatch.setattr("loan_calculator.throttling.rate_limit_config.CAPACITY", 1)
+        monkeypatch.setattr(
+            "loan_calculator.throttling.rate_limit_config.REFILL_PER_SECOND", 0.001
+        )
+        get_token_bucket_store.cache_clear()
+        data = {
+            "purchase_price": 100000,
+            "interest_rate": 5.0,
+            "dollar_down_payment": 20000,
+            "percentage_down_payment": None,
+            "mortgage_term": 360,
+        }
+
+        first = self.client.post(
+            self.loans_url, data=data, format="json", HTTP_X_API_KEY="client"
+        )
+        second = self.client.post(
+            self.loans_url, data=data, format="json", HTTP_X_API_KEY="client"
+        )
+        listed = self.client.get(self.loans_url, HTTP_X_API_KEY="client")
+        calculated = self.client.post(
+            f"{self.loans_url}affordability/",
+            data={
+                "monthly_budget": 3000,
+                "interest_rate": 6.5,
+                "dollar_down_payment": None,
+                "percentage_down_payment": 20,
+                "mortgage_term": 360,
+            },
+            format="json",
+            HTTP_X_API_KEY="client",
+        )
+        get_token_bucket_store.cache_clear()
+
+        assert first.status_code == status.HTTP_201_CREATED
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(second.headers["Retry-After"]) > 0
+        assert listed.status_code == status.HTTP_200_OK
+        assert calculated.status_code == status.HTTP_200_OK
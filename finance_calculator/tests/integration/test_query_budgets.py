@@ -0,0 +1,150 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from loan_calculator.models import Loan
+from loan_calculator.services.snapshot import loan_snapshot
+
+LOANS_COUNT = 50
+# Generous enough for a slow CI machine, tight enough to catch per-row work
+MAX_MS = 500
+
+
+@pytest.fixture
+def loans(test_loan_data):
+    return Loan.objects.bulk_create(Loan(**test_loan_data) for _ in range(LOANS_COUNT))
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    client = APIClient()
+    loans_url = "/api/v1/loans/"
+    loan_input = {
+        "purchase_price": 100000,
+        "interest_rate": 5.0,
+        "dollar_down_payment": 20000,
+        "percentage_down_payment": None,
+        "mortgage_term": 360,
+    }
+    affordability_input = {
+        "monthly_budget": 2500,
+        "interest_rate": 6.0,
+        "mortgage_term": 360,
+        "dollar_down_payment": 50000,
+        "percentage_down_payment": None,
+    }
+
+    def test_list_loans(self, query_budget, loans):
+        # Validators aggregate, then the page itself
+        with query_budget(max_queries=2, max_rows=LOANS_COUNT + 1, max_ms=MAX_MS):
+            response = self.client.get(self.loans_url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == LOANS_COUNT
+
+    def test_list_loans_projected_filtered(self, query_budget, loans):
+        with query_budget(max_queries=2, max_rows=LOANS_COUNT + 1, max_ms=MAX_MS):
+            response = self.client.get(
+                self.loans_url,
+                {"fields": "id,monthly_payment", "interest_rate_min": 1},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == LOANS_COUNT
+
+    def test_list_loans_sharded(self, query_budget, test_loan_data, loan_shards):
+        for alias in loan_shards:
+            Loan.objects.using(alias).bulk_create(
+                Loan(**test_loan_data) for _ in range(LOANS_COUNT)
+            )
+
+        # Validators aggregate, then a full page, on every shard before the merge
+        with query_budget(
+            max_queries=2 * len(loan_shards), max_rows=11 * len(loan_shards)
+        ) as budget:
+            response = self.client.get(self.loans_url, {"limit": 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 10
+        assert {query["alias"] for query in budget.queries} == set(loan_shards)
+
+    def test_list_loans_not_modified(self, query_budget, loans):
+        etag = self.client.get(self.loans_url).headers["ETag"]
+
+        with query_budget(max_queries=1, max_rows=1, max_ms=MAX_MS):
+            response = self.client.get(self.loans_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_archived_loans(self, query_budget):
+        with query_budget(max_queries=2, max_rows=1, max_ms=MAX_MS):
+            response = self.client.get(self.loans_url, {"archived": "true"})
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_generate_rates(self, query_budget):
+        # The insert returns the new id
+        with query_budget(max_queries=1, max_rows=1, max_ms=MAX_MS):
+            response = self.client.post(self.loans_url, self.loan_input, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_generate_rates_idempotent(self, query_budget):
+        # Lookup, then the claim and the execution in their own savepoints:
+        # savepoint, prune, claim, release, savepoint, loan insert, response update,
+        # release
+        with query_budget(max_queries=9, max_rows=2, max_ms=MAX_MS):
+            response = self.client.post(
+                self.loans_url,
+                self.loan_input,
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="budget-key",
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        with query_budget(max_queries=1, max_rows=1, max_ms=MAX_MS):
+            response = self.client.post(
+                self.loans_url,
+                self.loan_input,
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="budget-key",
+            )
+        assert response.headers["Idempotent-Replayed"] == "true"
+
+    def test_loans_summary(self, query_budget, test_loan_data, loans, monkeypatch):
+        loan_snapshot.refresh()
+        monkeypatch.setattr(
+            "loan_calculator.services.snapshot.snapshot_config.RECOUNT_SECONDS", 60
+        )
+        Loan.objects.create(**test_loan_data)
+
+        # An index probe for updated loans, then only the new loan is fetched
+        with query_budget(max_queries=2, max_rows=1, max_ms=MAX_MS):
+            response = self.client.get(f"{self.loans_url}summary/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == LOANS_COUNT + 1
+
+    def test_affordability_batch(self, query_budget):
+        with query_budget(max_queries=0, max_ms=MAX_MS):
+            response = self.client.post(
+                f"{self.loans_url}affordability/",
+                [self.affordability_input] * 100,
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 100
+
+    def test_budget_exceeded_report(self, query_budget, loans):
+        with pytest.raises(pytest.fail.Exception) as error:
+            with query_budget(max_queries=2, max_rows=5):
+                for loan in Loan.objects.all()[:3]:
+                    Loan.objects.get(id=loan.id)
+
+        message = str(error.value)
+        assert message.startswith(
+            "Query budget exceeded: queries 4 > 2, rows fetched 6 > 5"
+        )
+        assert "+   3. [default, 1 rows" in message
+        assert "4 queries, 2 distinct, 2 repeated" in message
@@ -0,0 +1,125 @@
+import pytest
+
+from loan_calculator.services.affordability import AffordabilityCalculator
+from loan_calculator.services.loan import LoanCalculator
+
+
+def monthly_total(result):
+    return (
+        result["monthly_principal_and_interest"]
+        + result["monthly_property_tax"]
+        + result["monthly_insurance"]
+        + result["monthly_pmi"]
+    )
+
+
+class TestAffordabilityCalculator:
+    @pytest.mark.parametrize(
+        "interest_rate, mortgage_term, expected_factor",
+        [
+            (0, 120, 1 / 120),
+            # So tiny that (1 + rate) ** term rounds to 1
+            (1e-14, 360, 1 / 360),
+            (1e-20, 360, 1 / 360),
+            (6.5, 360, 0.006320680),
+            (6.4, 360, 0.006255059),
+        ],
+    )
+    def test_get_payment_factor(self, interest_rate, mortgage_term, expected_factor):
+        result = AffordabilityCalculator.get_payment_factor(
+            interest_rate, mortgage_term
+        )
+        assert result == pytest.approx(expected_factor)
+
+    def test_reverses_calculate_loan(self):
+        result = AffordabilityCalculator.calculate_max_purchase_price(
+            monthly_budget=2842.35,
+            interest_rate=5.0,
+            mortgage_term=30,
+            dollar_down_payment=20000,
+            percentage_down_payment=None,
+        )
+
+        assert result["max_purchase_price"] == pytest.approx(100000, abs=0.05)
+        assert result["loan_amount"] == pytest.approx(80000, abs=0.05)
+        monthly_payment = LoanCalculator.calculate_monthly_payment(
+            result["loan_amount"], 5.0, 30
+        )
+        assert monthly_payment <= 2842.35
+
+    @pytest.mark.parametrize(
+        "dollar_down_payment, percentage_down_payment, expect_pmi",
+        [
+            (None, 10, True),
+            (None, 20, False),
+            (10000, None, True),
+            (200000, None, False),
+        ],
+    )
+    def test_calculate_max_purchase_price(
+        self, dollar_down_payment, percentage_down_payment, expect_pmi
+    ):
+        result = AffordabilityCalculator.calculate_max_purchase_price(
+            monthly_budget=3000,
+            interest_rate=6.5,
+            mortgage_term=360,
+            dollar_down_payment=dollar_down_payment,
+            percentage_down_payment=percentage_down_payment,
+            annual_property_tax_rate=1.2,
+            annual_insurance=1200,
+            annual_pmi_rate=0.5,
+        )
+
+        assert (result["monthly_pmi"] > 0) is expect_pmi
+        assert monthly_total(result) == pytest.approx(3000, abs=0.05)
+        assert result["loan_amount"] == pytest.approx(
+            result["max_purchase_price"] - result["down_payment"], abs=0.01
+        )
+
+    def test_calculate_max_purchase_price_pmi_boundary(self):
+        # Without PMI the budget would buy above five times the down payment,
+        # with PMI it would buy below it, so the PMI-free boundary is the answer
+        result = AffordabilityCalculator.calculate_max_purchase_price(
+            monthly_budget=1605,
+            interest_rate=6.5,
+            mortgage_term=360,
+            dollar_down_payment=50000,
+            percentage_down_payment=None,
+            annual_pmi_rate=5,
+        )
+
+        assert result["max_purchase_price"] == 250000
+        assert result["monthly_pmi"] == 0
+        assert monthly_total(result) <= 1605
+
+    def test_calculate_max_purchase_price_over_budget(self):
+        result = AffordabilityCalculator.calculate_max_purchase_price(
+            monthly_budget=50,
+            interest_rate=6.5,
+            mortgage_term=360,
+            dollar_down_payment=None,
+            percentage_down_payment=10,
+            annual_insurance=1200,
+        )
+
+        assert result["max_purchase_price"] == 0
+        assert result["loan_amount"] == 0
+
+    def test_calculate_max_purchase_prices(self):
+        rows = [
+            {
+                "monthly_budget": budget,
+                "interest_rate": 6.5,
+                "mortgage_term": 360,
+                "dollar_down_payment": None,
+                "percentage_down_payment": 20,
+            }
+            for budget in (1000, 2000, 3000)
+        ]
+
+        result = AffordabilityCalculator.calculate_max_purchase_prices(rows)
+
+        assert len(result) == 3
+        prices = [row["max_purchase_price"] for row in result]
+        assert prices == sorted(prices)
+        assert prices[1] == pytest.approx(2 * prices[0], abs=0.02)
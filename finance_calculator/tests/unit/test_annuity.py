@@ -0,0 +1,68 @@
+import pytest
+
+from loan_calculator.services.annuity import AnnuityFactorTable
+from loan_calculator.services.loan import LoanCalculator
+
+
+def calculate_monthly_payment_directly(loan_amount, interest_rate, mortgage_term):
+    monthly_interest_rate = interest_rate / (12 * 100)
+    return round(
+        (
+            loan_amount
+            * (monthly_interest_rate * (1 + monthly_interest_rate) ** mortgage_term)
+        )
+        / ((1 + monthly_interest_rate) ** mortgage_term - 1),
+        2,
+    )
+
+
+class TestAnnuityFactorTable:
+    @pytest.mark.parametrize(
+        "interest_rate, mortgage_term_in_months",
+        [
+            (0.05, 12),
+            (0, 360),
+            (15.125, 360),
+            (5.0, 30),
+            (5.0, 492),
+            (5.1, 360),
+        ],
+    )
+    def test_lookup_off_lattice(self, interest_rate, mortgage_term_in_months):
+        result = AnnuityFactorTable.lookup(interest_rate, mortgage_term_in_months)
+        assert result is None
+
+    @pytest.mark.parametrize(
+        "interest_rate, mortgage_term_in_months",
+        [
+            (0.125, 12),
+            (5, 360),
+            (6.875, 180.0),
+            (15.0, 480),
+        ],
+    )
+    def test_lookup_on_lattice(self, interest_rate, mortgage_term_in_months):
+        numerator, denominator = AnnuityFactorTable.lookup(
+            interest_rate, mortgage_term_in_months
+        )
+        monthly_interest_rate = interest_rate / (12 * 100)
+        compound = (1 + monthly_interest_rate) ** mortgage_term_in_months
+        assert numerator == monthly_interest_rate * compound
+        assert denominator == compound - 1
+
+    @pytest.mark.parametrize("loan_amount", [80000, 90000.15, 123456.78, 1500000])
+    def test_monthly_payment_matches_formula(self, loan_amount):
+        rates_count = int(AnnuityFactorTable.MAX_RATE / AnnuityFactorTable.RATE_STEP)
+        for rate_index in range(1, rates_count + 1):
+            interest_rate = rate_index * AnnuityFactorTable.RATE_STEP
+            for mortgage_term in range(
+                AnnuityFactorTable.TERM_STEP,
+                AnnuityFactorTable.MAX_TERM + 1,
+                AnnuityFactorTable.TERM_STEP,
+            ):
+                result = LoanCalculator.calculate_monthly_payment(
+                    loan_amount, interest_rate, mortgage_term
+                )
+                assert result == calculate_monthly_payment_directly(
+                    loan_amount, interest_rate, mortgage_term
+                )
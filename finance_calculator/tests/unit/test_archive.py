@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.utils import timezone
+
+from loan_calculator.models import ArchivedLoan, Loan
+from loan_calculator.services.archive import LoanArchiver
+
+
+@pytest.mark.django_db
+class TestLoanArchiver:
+    loan_data = {
+        "total_amount": 100000,
+        "total_over_loan_term": 20000,
+        "mortgage_term": 5,
+        "interest_rate": 4.5,
+        "monthly_payment": 2000,
+    }
+
+    def create_loan(self, days_ago):
+        return Loan.objects.create(
+            **self.loan_data, created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_archive_loans(self):
+        old_loans = [self.create_loan(days_ago=400) for _ in range(5)]
+        recent_loan = self.create_loan(days_ago=10)
+
+        result = LoanArchiver.archive_loans(older_than_days=365, chunk_size=2)
+
+        assert result == 5
+        assert list(Loan.objects.values_list("id", flat=True)) == [recent_loan.id]
+        archived = ArchivedLoan.objects.order_by("id")
+        assert [loan.loan_id for loan in archived] == [loan.id for loan in old_loans]
+        assert {loan.shard for loan in archived} == {"default"}
+        for loan, archived_loan in zip(old_loans, archived):
+            assert archived_loan.created_at == loan.created_at
+            assert archived_loan.total_amount == loan.total_amount
+            assert archived_loan.period == loan.created_at.date().replace(day=1)
+
+    def test_archive_loans_nothing_to_archive(self):
+        self.create_loan(days_ago=10)
+
+        result = LoanArchiver.archive_loans(older_than_days=365, chunk_size=100)
+
+        assert result == 0
+        assert Loan.objects.count() == 1
+        assert ArchivedLoan.objects.count() == 0
+
+    def test_archive_loans_command(self):
+        self.create_loan(days_ago=40)
+
+        call_command("archive_loans", "--older-than-days=30", "--chunk-size=10")
+
+        assert Loan.objects.count() == 0
+        assert ArchivedLoan.objects.count() == 1
+
+    def test_archived_loan_key_per_shard(self):
+        period = timezone.now().date().replace(day=1)
+        for shard in ("loans_0", "loans_1"):
+            ArchivedLoan.objects.create(
+                **self.loan_data, loan_id=1, shard=shard, period=period
+            )
+
+        with pytest.raises(IntegrityError):
+            ArchivedLoan.objects.create(
+                **self.loan_data, loan_id=1, shard="loans_0", period=period
+            )
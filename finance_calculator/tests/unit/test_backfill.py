@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from loan_calculator.models import ArchivedLoan, Loan
+from loan_calculator.services.backfill import LoanBackfiller
+from loan_calculator.services.loan import LoanCalculator
+
+
+@pytest.mark.django_db
+class TestLoanBackfiller:
+    def create_legacy_loan(self, interest_rate, mortgage_term):
+        total_amount, monthly_payment, total_over_loan_term, _ = (
+            LoanCalculator.calculate_loan(
+                purchase_price=300000,
+                interest_rate=interest_rate,
+                dollar_down_payment=60000,
+                percentage_down_payment=None,
+                mortgage_term=mortgage_term,
+            )
+        )
+        return Loan.objects.create(
+            total_amount=total_amount,
+            monthly_payment=monthly_payment,
+            total_over_loan_term=total_over_loan_term,
+            interest_rate=0.0,
+            mortgage_term=mortgage_term / 12,
+        )
+
+    def test_backfill(self):
+        loans = [
+            self.create_legacy_loan(interest_rate=6.5, mortgage_term=360),
+            self.create_legacy_loan(interest_rate=4.375, mortgage_term=180),
+            self.create_legacy_loan(interest_rate=12.1, mortgage_term=30),
+        ]
+
+        result = LoanBackfiller.backfill(chunk_size=2)
+
+        assert result == 3
+        backfilled = Loan.objects.order_by("id")
+        assert [loan.annual_interest_rate for loan in backfilled] == [6.5, 4.375, 12.1]
+        assert [loan.mortgage_term_in_months for loan in backfilled] == [360, 180, 30]
+        for loan, original in zip(backfilled, loans):
+            assert loan.total_interest == round(
+                original.total_over_loan_term - original.total_amount, 2
+            )
+            assert 0 < loan.interest_share < 1
+            assert loan.updated_at > original.updated_at
+        assert LoanBackfiller.backfill(chunk_size=2) == 0
+
+    def test_backfill_archived_loans(self):
+        loan = self.create_legacy_loan(interest_rate=6.5, mortgage_term=360)
+        archived = ArchivedLoan.objects.create(
+            **{
+                field.name: getattr(loan, field.name)
+                for field in Loan._meta.concrete_fields
+                if field.name != "id"
+            },
+            loan_id=loan.id,
+            period=date(2024, 1, 1),
+        )
+        loan.delete()
+
+        assert LoanBackfiller.backfill(chunk_size=2) == 1
+
+        archived.refresh_from_db()
+        assert archived.annual_interest_rate == 6.5
+        assert archived.mortgage_term_in_months == 360
+        assert archived.total_interest == round(
+            archived.total_over_loan_term - archived.total_amount, 2
+        )
+        assert LoanBackfiller.backfill(chunk_size=2) == 0
+
+    def test_backfill_command(self):
+        self.create_legacy_loan(interest_rate=6.5, mortgage_term=360)
+
+        call_command("backfill_loan_derived_fields", "--chunk-size=10")
+
+        assert Loan.objects.get().annual_interest_rate == 6.5
@@ -0,0 +1,103 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, connection
+from rest_framework import status
+
+from loan_calculator.models import IdempotencyKey
+from loan_calculator.services.idempotency import IdempotencyService
+
+REQUEST_DATA = {"purchase_price": 100000}
+RESPONSE = {"data": {"monthly_payment": 500}, "status": status.HTTP_201_CREATED}
+
+
+class TestIdempotencyService:
+    @pytest.mark.django_db(transaction=True)
+    def test_retry_while_in_progress(self):
+        retries = []
+
+        def retry():
+            try:
+                retries.append(
+                    IdempotencyService.replay_or_execute(
+                        key="abc", request_data=REQUEST_DATA, execute=lambda: RESPONSE
+                    )
+                )
+            finally:
+                connection.close()
+
+        def execute():
+            # The retry runs on its own connection while the first request executes
+            thread = threading.Thread(target=retry)
+            thread.start()
+            thread.join()
+            return RESPONSE
+
+        response = IdempotencyService.replay_or_execute(
+            key="abc", request_data=REQUEST_DATA, execute=execute
+        )
+
+        assert response == {**RESPONSE, "replayed": False}
+        assert retries[0]["status"] == status.HTTP_409_CONFLICT
+        assert IdempotencyService.replay_or_execute(
+            key="abc", request_data=REQUEST_DATA, execute=execute
+        ) == {**RESPONSE, "replayed": True}
+
+    @pytest.mark.django_db
+    def test_claim_released_by_concurrent_request(self, monkeypatch):
+        save = IdempotencyKey.save
+        conflicts = []
+
+        def save_after_conflict(self, *args, **kwargs):
+            # A concurrent claim conflicts once and is gone on the next lookup
+            if not conflicts:
+                conflicts.append(self.key)
+                raise IntegrityError("UNIQUE constraint failed")
+            return save(self, *args, **kwargs)
+
+        monkeypatch.setattr(IdempotencyKey, "save", save_after_conflict)
+
+        response = IdempotencyService.replay_or_execute(
+            key="abc", request_data=REQUEST_DATA, execute=lambda: RESPONSE
+        )
+
+        assert response == {**RESPONSE, "replayed": False}
+        assert conflicts == ["abc"]
+        assert IdempotencyKey.objects.get().response_status == RESPONSE["status"]
+
+    @pytest.mark.django_db
+    def test_claim_released_when_execute_fails(self):
+        def execute():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            IdempotencyService.replay_or_execute(
+                key="abc", request_data=REQUEST_DATA, execute=execute
+            )
+
+        assert not IdempotencyKey.objects.exists()
+
+    @pytest.mark.django_db
+    def test_abandoned_claim_taken_over(self):
+        claim = IdempotencyKey.objects.create(
+            key="abc",
+            request_hash=IdempotencyService.get_request_hash(REQUEST_DATA),
+        )
+
+        in_progress = IdempotencyService.replay_or_execute(
+            key="abc", request_data=REQUEST_DATA, execute=lambda: RESPONSE
+        )
+        # The worker holding the claim was killed before storing its response
+        IdempotencyKey.objects.filter(pk=claim.pk).update(
+            created_at=IdempotencyService.get_claim_cutoff() - timedelta(seconds=1)
+        )
+        retried = IdempotencyService.replay_or_execute(
+            key="abc", request_data=REQUEST_DATA, execute=lambda: RESPONSE
+        )
+
+        assert in_progress["status"] == status.HTTP_409_CONFLICT
+        assert retried == {**RESPONSE, "replayed": False}
+        record = IdempotencyKey.objects.get()
+        assert record.pk != claim.pk
+        assert record.response_status == RESPONSE["status"]
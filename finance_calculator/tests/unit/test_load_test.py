@@ -0,0 +1,30 @@
+from loan_calculator.management.commands.load_test import Command
+
+
+class TestLoadTestCommand:
+    def test_summarize(self):
+        samples = [("create", latency / 1000, "ok") for latency in range(1, 101)]
+        samples.append(("list", 6.0, "error"))
+        samples.append(("create", 0.0005, "throttled"))
+
+        result = Command.summarize(samples, elapsed=2.0)
+
+        assert result["requests"] == 102
+        assert result["errors"] == 1
+        assert result["throttled"] == 1
+        assert result["shed"] == 0
+        assert result["throughput_rps"] == 51
+        assert result["p50_ms"] == 50
+        assert result["p99_ms"] == 100
+        assert result["max_ms"] == 6000
+        assert result["histogram"]["<=1ms"] == 2
+        assert result["histogram"]["<=100ms"] == 50
+        assert result["histogram"][">5000ms"] == 1
+        assert sum(result["histogram"].values()) == 102
+
+    def test_summarize_empty(self):
+        result = Command.summarize([], elapsed=1.0)
+
+        assert result["requests"] == 0
+        assert result["p99_ms"] is None
+        assert sum(result["histogram"].values()) == 0
@@ -90,7 +90,7 @@ class TestLoanCalculator:
         "purchase_price, dollar_down_payment, percentage_down_payment, expected_down_payment",
         [
             (100000, 20000, None, 20000),
-            (100000, None, 0.2, 20000),
+            (100000, None, 20, 20000),
         ],
     )
     def test_get_down_payment(
@@ -194,6 +194,56 @@ class TestLoanCalculator:
         assert result["data"]["total_interest_paid_over_loan_term"] == 0.0
         assert result["data"]["mortgage_term_in_years"] == 7.5
 
+        loan = Loan.objects.get()
+        assert loan.annual_interest_rate == 20
+        assert loan.mortgage_term_in_months == 90
+        assert loan.total_interest == 84397.5
+        assert loan.interest_share == round(84397.5 / 174397.5, 6)
+
+    @pytest.mark.parametrize(
+        "loan_amount, interest_rate, mortgage_term_in_months",
+        [
+            (80000, 5.0, 30),
+            (90000.15, 20.1, 48),
+            (240000, 6.875, 360),
+            (100000, 150.0, 360),
+            (1000000, 400.0, 12),
+        ],
+    )
+    def test_calculate_annual_interest_rate(
+        self, loan_amount, interest_rate, mortgage_term_in_months
+    ):
+        monthly_payment = LoanCalculator.calculate_monthly_payment(
+            loan_amount, interest_rate, mortgage_term_in_months
+        )
+        result = LoanCalculator.calculate_annual_interest_rate(
+            loan_amount, monthly_payment, mortgage_term_in_months
+        )
+        assert result == interest_rate
+
+    def test_calculate_annual_interest_rate_interest_free(self):
+        result = LoanCalculator.calculate_annual_interest_rate(12000, 1000, 12)
+        assert result == 0.0
+
+    def test_calculate_annual_interest_rate_without_loan_amount(self):
+        result = LoanCalculator.calculate_annual_interest_rate(0, 1000, 12)
+        assert result is None
+
+    @pytest.mark.parametrize(
+        "total_over_loan_term, loan_amount, expected_interest_share",
+        [
+            (120000, 90000, 0.25),
+            (0, 0, 0.0),
+        ],
+    )
+    def test_calculate_interest_share(
+        self, total_over_loan_term, loan_amount, expected_interest_share
+    ):
+        result = LoanCalculator.calculate_interest_share(
+            total_over_loan_term, loan_amount
+        )
+        assert result == expected_interest_share
+
     @pytest.mark.django_db
     def test_calculate_and_save_loan_fail(self):
         with pytest.raises(TypeError):
@@ -0,0 +1,121 @@
+import math
+
+import pytest
+from django.core.management import call_command
+
+from loan_calculator.models import Loan
+from loan_calculator.services.backfill import LoanBackfiller
+from loan_calculator.services.loan import LoanCalculator
+from loan_calculator.services.loan_store import (
+    LoanStoreError,
+    LoanStoreJobs,
+    LoanStoreReader,
+    LoanStoreWriter,
+)
+
+
+class TestLoanStore:
+    def test_write_and_read(self, tmp_path):
+        path = tmp_path / "inputs.bin"
+        rows = [(100000 + i, 5.0, 20000, math.nan, 360) for i in range(10)]
+        with LoanStoreWriter(path, kind="inputs") as writer:
+            writer.write_rows(rows[:4])
+            writer.write_rows(rows[4:])
+
+        with LoanStoreReader(path) as reader:
+            assert reader.kind == "inputs"
+            assert reader.records_count == 10
+            chunks = [list(reader.iter_rows(chunk)) for chunk in reader.chunks(3)]
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+        read_rows = [row for chunk in chunks for row in chunk]
+        assert [row[0] for row in read_rows] == [row[0] for row in rows]
+        assert all(math.isnan(row[3]) for row in read_rows)
+
+    def test_write_rows_wrong_width(self, tmp_path):
+        with LoanStoreWriter(tmp_path / "inputs.bin", kind="inputs") as writer:
+            with pytest.raises(LoanStoreError):
+                writer.write_rows([(1.0, 2.0)])
+
+    def test_read_not_a_store(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"x" * 64)
+
+        with pytest.raises(LoanStoreError):
+            LoanStoreReader(path)
+
+    def test_close_with_pending_chunks(self, tmp_path):
+        path = tmp_path / "inputs.bin"
+        with LoanStoreWriter(path, kind="inputs") as writer:
+            writer.write_rows([(100000, 5.0, 20000, math.nan, 360)] * 4)
+
+        reader = LoanStoreReader(path)
+        chunks = reader.chunks(2)
+        next(chunks)
+        reader.close()
+
+    def test_calculate(self, tmp_path):
+        inputs_path = tmp_path / "inputs.bin"
+        results_path = tmp_path / "results.bin"
+        with LoanStoreWriter(inputs_path, kind="inputs") as writer:
+            writer.write_rows(
+                [
+                    (100000, 5.0, 20000, math.nan, 360),
+                    (100000.15, 20.1, 10000, math.nan, 48),
+                    (100000, 5.0, math.nan, math.nan, 360),
+                ]
+            )
+
+        result = LoanStoreJobs.calculate(inputs_path, results_path, chunk_size=2)
+
+        assert result == 3
+        with LoanStoreReader(results_path) as reader:
+            rows = [
+                row for chunk in reader.chunks(2) for row in reader.iter_rows(chunk)
+            ]
+        assert rows[0] == (
+            *LoanCalculator.calculate_loan(100000, 5.0, 20000, None, 360),
+            30.0,
+        )
+        assert rows[1][:4] == (90000.15, 2743.53, 131689.44, 0.0)
+        assert all(math.isnan(value) for value in rows[2])
+
+    @pytest.mark.django_db
+    def test_export_and_import_loans(self, tmp_path):
+        path = tmp_path / "loans.bin"
+        loans = [
+            Loan.objects.create(
+                total_amount=100000 + i,
+                total_over_loan_term=20000,
+                mortgage_term=5,
+                interest_rate=4.5,
+                monthly_payment=2000,
+            )
+            for i in range(5)
+        ]
+        LoanCalculator.calculate_and_save_loan(
+            purchase_price=100000,
+            interest_rate=5.0,
+            dollar_down_payment=20000,
+            percentage_down_payment=None,
+            mortgage_term=360,
+        )
+        loans.append(Loan.objects.latest("id"))
+
+        call_command("loan_store", "--chunk-size=2", "export", str(path))
+        Loan.objects.all().delete()
+        call_command("loan_store", "--chunk-size=2", "import", str(path))
+
+        imported = Loan.objects.order_by("id")
+        assert [loan.total_amount for loan in imported] == [
+            loan.total_amount for loan in loans
+        ]
+        assert [loan.created_at for loan in imported] == [
+            loan.created_at for loan in loans
+        ]
+        derived_fields = LoanBackfiller.DERIVED_FIELDS
+        assert [
+            [getattr(loan, name) for name in derived_fields] for loan in imported
+        ] == [[getattr(loan, name) for name in derived_fields] for loan in loans]
+        assert imported.last().mortgage_term_in_months == 360
+        assert imported.first().annual_interest_rate is None
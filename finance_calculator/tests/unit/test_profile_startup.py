@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from loan_calculator.management.commands.profile_startup import Command
+
+
+class TestProfileStartupCommand:
+    def test_parse_import_times(self):
+        stderr = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       120 |        120 |     _io",
+                "import time:      1500 |       2500 |   django.utils",
+                "import time:      3000 |       5500 | django",
+                "Warm-up could not connect to 'default'",
+            ]
+        )
+
+        result = Command.parse_import_times(stderr)
+
+        assert result == [
+            {"module": "_io", "self_ms": 0.12, "cumulative_ms": 0.12, "depth": 2},
+            {
+                "module": "django.utils",
+                "self_ms": 1.5,
+                "cumulative_ms": 2.5,
+                "depth": 1,
+            },
+            {"module": "django", "self_ms": 3.0, "cumulative_ms": 5.5, "depth": 0},
+        ]
+
+    def test_check_first_request_time(self):
+        results = {"first_request_status": 200, "time_to_first_request_ms": 250.0}
+
+        Command.check_first_request_time(results, max_first_request_ms=300)
+        with pytest.raises(CommandError):
+            Command.check_first_request_time(results, max_first_request_ms=200)
+        with pytest.raises(CommandError):
+            Command.check_first_request_time(
+                {**results, "first_request_status": 500}, max_first_request_ms=300
+            )
+
+    def test_max_first_request_ms_exceeded(self):
+        with pytest.raises(CommandError, match="exceeds"):
+            call_command("profile_startup", "--max-first-request-ms=0.001", "--top=1")
+
+    def test_max_first_request_ms_without_request(self):
+        with pytest.raises(CommandError):
+            call_command(
+                "profile_startup", "--entry=manage", "--max-first-request-ms=1000"
+            )
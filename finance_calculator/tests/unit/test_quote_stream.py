@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+
+from finance_calculator.config import quote_stream_config
+from loan_calculator.quote_stream import TRY_AGAIN_LATER, QuoteSession, QuoteStream
+from loan_calculator.services.quote import QuoteService
+
+SCOPE = {"type": "websocket", "path": quote_stream_config.PATH}
+LOAN_INPUTS = {
+    "purchase_price": 300000,
+    "interest_rate": 6,
+    "dollar_down_payment": 30000,
+    "percentage_down_payment": None,
+    "mortgage_term": 360,
+}
+
+
+class FakeSocket:
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.sent = asyncio.Queue()
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        await self.sent.put(message)
+
+    def send_delta(self, delta):
+        self.incoming.put_nowait({"type": "websocket.receive", "text": delta})
+
+    async def next_json(self):
+        message = await asyncio.wait_for(self.sent.get(), timeout=1)
+        return json.loads(message["text"])
+
+
+@pytest.fixture
+def fast_debounce(monkeypatch):
+    monkeypatch.setattr(quote_stream_config, "DEBOUNCE_MS", 20)
+
+
+class TestQuoteStream:
+    def test_calculate_quote(self):
+        quote = QuoteService.calculate_quote(LOAN_INPUTS)
+
+        assert quote["loan_details"]["total_amount"] == 270000
+        assert quote["loan_details"]["mortgage_term_in_years"] == 30
+
+    def test_calculate_quote_invalid(self):
+        quote = QuoteService.calculate_quote({"purchase_price": -1})
+
+        assert "purchase_price" in quote["errors"]
+        assert "interest_rate" in quote["errors"]
+
+    def test_deltas_are_coalesced(self, fast_debounce):
+        async def session():
+            stream, socket = QuoteStream(), FakeSocket()
+            socket.incoming.put_nowait({"type": "websocket.connect"})
+            serving = asyncio.create_task(stream(SCOPE, socket.receive, socket.send))
+            assert (await socket.sent.get())["type"] == "websocket.accept"
+            assert stream.connections == 1
+
+            socket.send_delta(json.dumps({**LOAN_INPUTS, "seq": 1}))
+            socket.send_delta(json.dumps({"purchase_price": 400000, "seq": 2}))
+            socket.send_delta(
+                json.dumps({"dollar_down_payment": None, "percentage_down_payment": 25})
+            )
+            quote = await socket.next_json()
+
+            socket.incoming.put_nowait({"type": "websocket.disconnect"})
+            await serving
+            return stream, socket, quote
+
+        stream, socket, quote = asyncio.run(session())
+
+        assert quote["seq"] == 2
+        assert quote["loan_details"]["total_amount"] == 300000
+        assert quote["latency_ms"] >= quote_stream_config.DEBOUNCE_MS
+        assert socket.sent.empty()
+        assert stream.connections == 0
+
+    def test_invalid_delta(self, fast_debounce):
+        async def session():
+            stream, socket = QuoteStream(), FakeSocket()
+            socket.incoming.put_nowait({"type": "websocket.connect"})
+            serving = asyncio.create_task(stream(SCOPE, socket.receive, socket.send))
+            await socket.sent.get()
+
+            socket.send_delta("[1, 2")
+            error = await socket.next_json()
+            socket.send_delta(json.dumps({"interest_rate": 5}))
+            quote = await socket.next_json()
+
+            socket.incoming.put_nowait({"type": "websocket.disconnect"})
+            await serving
+            return error, quote
+
+        error, quote = asyncio.run(session())
+
+        assert "non_field_errors" in error["errors"]
+        assert "purchase_price" in quote["errors"]
+        assert "interest_rate" not in quote["errors"]
+
+    def test_unknown_fields_dropped(self):
+        async def session():
+            quote_session = QuoteSession(FakeSocket().send)
+            await quote_session.merge(
+                json.dumps({**LOAN_INPUTS, "seq": 3, "padding": "x" * 1000})
+            )
+            return quote_session
+
+        quote_session = asyncio.run(session())
+
+        assert quote_session.inputs == LOAN_INPUTS
+        assert quote_session.seq == 3
+
+    def test_connections_cap(self, monkeypatch):
+        monkeypatch.setattr(quote_stream_config, "MAX_CONNECTIONS", 0)
+
+        async def session():
+            socket = FakeSocket()
+            socket.incoming.put_nowait({"type": "websocket.connect"})
+            await QuoteStream()(SCOPE, socket.receive, socket.send)
+            return await socket.sent.get()
+
+        message = asyncio.run(session())
+
+        assert message == {"type": "websocket.close", "code": TRY_AGAIN_LATER}
@@ -0,0 +1,343 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from loan_calculator.models import ArchivedLoan, IdempotencyKey, Loan
+from loan_calculator.routers import LoanShardRouter
+from loan_calculator.services.analytics import LoanAnalytics
+from loan_calculator.services.archive import LoanArchiver
+from loan_calculator.services.backfill import LoanBackfiller
+from loan_calculator.services.loan import LoanCalculator
+from loan_calculator.services.loan_store import LoanStoreJobs, LoanStoreReader
+from loan_calculator.services.shards import LoanShards, get_fan_out_executor
+from loan_calculator.services.snapshot import get_loan_snapshots
+from tests.conftest import SHARDS
+
+LOAN_DATA = {
+    "total_amount": 100000,
+    "total_over_loan_term": 20000,
+    "mortgage_term": 5,
+    "interest_rate": 4.5,
+    "monthly_payment": 2000,
+}
+
+
+def client_id_for(alias):
+    return next(
+        f"client-{index}"
+        for index in range(1000)
+        if LoanShards.get_alias(f"client-{index}") == alias
+    )
+
+
+def create_loan(alias, created_at, **kwargs):
+    loan = Loan(
+        **{**LOAN_DATA, **kwargs},
+        client_id=client_id_for(alias),
+        created_at=created_at,
+        updated_at=created_at,
+    )
+    loan.save()
+    return loan
+
+
+class TestLoanShards:
+    client = APIClient()
+    loans_url = "/api/v1/loans/"
+
+    def test_get_alias_without_shards(self):
+        assert LoanShards.get_aliases() == ["default"]
+        assert LoanShards.get_alias("client") == "default"
+
+    def test_get_alias(self, settings):
+        settings.LOAN_SHARDS = SHARDS
+
+        aliases = [LoanShards.get_alias(f"client-{index}") for index in range(300)]
+
+        assert aliases == [
+            LoanShards.get_alias(f"client-{index}") for index in range(300)
+        ]
+        assert all(aliases.count(alias) > 50 for alias in SHARDS)
+
+    def test_fan_out_reuses_connections(self, loan_shards, monkeypatch):
+        monkeypatch.setattr(
+            "loan_calculator.services.shards.sharding_config.FAN_OUT_WORKERS", 1
+        )
+        get_fan_out_executor.cache_clear()
+        for alias in SHARDS:
+            connections.settings[alias]["CONN_MAX_AGE"] = 60
+        connected = []
+        connection_created.connect(
+            lambda connection, **kwargs: connected.append(connection.alias),
+            weak=False,
+            dispatch_uid="test_fan_out_reuses_connections",
+        )
+
+        try:
+            for _ in range(2):
+                LoanShards.fan_out(
+                    lambda alias: Loan.objects.using(alias).count(), SHARDS
+                )
+        finally:
+            connection_created.disconnect(
+                dispatch_uid="test_fan_out_reuses_connections"
+            )
+
+        assert sorted(connected) == SHARDS
+
+    def test_allow_migrate(self, settings):
+        settings.LOAN_SHARDS = SHARDS
+        router = LoanShardRouter()
+
+        assert router.allow_migrate("loans_0", "loan_calculator", "loan") is True
+        assert (
+            router.allow_migrate("loans_0", "loan_calculator", "idempotencykey") is True
+        )
+        assert (
+            router.allow_migrate("loans_0", "loan_calculator", "archivedloan") is False
+        )
+        assert router.allow_migrate("loans_0", "auth", "user") is False
+        assert router.allow_migrate("default", "loan_calculator", "loan") is None
+
+    def test_save_loan_routed_by_client(self, loan_shards):
+        for client_id in ["alice", "bob", "carol", "dave"]:
+            LoanCalculator.calculate_and_save_loan(
+                purchase_price=100000,
+                interest_rate=5.0,
+                dollar_down_payment=20000,
+                percentage_down_payment=None,
+                mortgage_term=360,
+                client_id=client_id,
+            )
+
+        for client_id in ["alice", "bob", "carol", "dave"]:
+            alias = LoanShards.get_alias(client_id)
+            assert Loan.objects.using(alias).filter(client_id=client_id).count() == 1
+        assert sum(Loan.objects.using(alias).count() for alias in SHARDS) == 4
+
+    def test_list_loans_merged(self, loan_shards):
+        started_at = datetime(2024, 1, 1)
+        # Inserted out of order, so ids disagree with the creation times
+        for index in [3, 7, 0, 5, 1, 8, 2, 6, 4]:
+            create_loan(
+                SHARDS[index % 3],
+                created_at=started_at + timedelta(hours=index),
+                total_amount=index,
+            )
+
+        response = self.client.get(self.loans_url)
+        first_page = self.client.get(self.loans_url, {"limit": 4})
+        projected = self.client.get(
+            self.loans_url, {"limit": 2, "fields": "total_amount"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [loan["total_amount"] for loan in response.data] == list(
+            range(8, -1, -1)
+        )
+        assert "client_id" not in response.data[0]
+        assert [loan["total_amount"] for loan in first_page.data] == [8, 7, 6, 5]
+        assert projected.data == [{"total_amount": 8}, {"total_amount": 7}]
+
+    def test_list_loans_keyset_pages(self, loan_shards):
+        started_at = datetime(2024, 1, 1)
+        for alias, hours, total_amount in [
+            ("loans_0", 1, 10),
+            ("loans_0", 1, 11),
+            ("loans_0", 0, 12),
+            ("loans_1", -5, 20),
+            ("loans_1", -5, 21),
+            ("loans_1", 1, 22),
+            ("loans_1", 0, 23),
+        ]:
+            create_loan(
+                alias,
+                created_at=started_at + timedelta(hours=hours),
+                total_amount=total_amount,
+            )
+
+        pages = []
+        params = {"limit": 2, "fields": "id,created_at,total_amount"}
+        while page := self.client.get(self.loans_url, params).data:
+            pages.append([loan["total_amount"] for loan in page])
+            params = {
+                **params,
+                "created_at_before": page[-1]["created_at"],
+                "id_before": page[-1]["id"],
+            }
+
+        assert pages == [[22, 11], [10, 23], [12, 21], [20]]
+
+    def test_list_loans_ordering_and_filter(self, loan_shards):
+        started_at = datetime(2024, 1, 1)
+        for index in range(6):
+            create_loan(
+                SHARDS[index % 3],
+                created_at=started_at + timedelta(hours=index),
+                total_amount=index * 10,
+            )
+
+        response = self.client.get(
+            self.loans_url, {"ordering": "total_amount", "total_amount_min": 20}
+        )
+
+        assert [loan["total_amount"] for loan in response.data] == [20, 30, 40, 50]
+
+    def test_list_loans_etag_covers_every_shard(self, loan_shards):
+        create_loan("loans_0", created_at=datetime(2024, 1, 1))
+        etag = self.client.get(self.loans_url).headers["ETag"]
+        assert (
+            self.client.get(self.loans_url, HTTP_IF_NONE_MATCH=etag).status_code
+            == status.HTTP_304_NOT_MODIFIED
+        )
+
+        create_loan("loans_2", created_at=datetime(2023, 1, 1))
+
+        response = self.client.get(self.loans_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 2
+
+    def test_create_loan_routed_by_header(self, loan_shards):
+        response = self.client.post(
+            self.loans_url,
+            {
+                "purchase_price": 100000,
+                "interest_rate": 5.0,
+                "dollar_down_payment": 20000,
+                "percentage_down_payment": None,
+                "mortgage_term": 360,
+            },
+            format="json",
+            HTTP_X_CLIENT_ID="tenant-42",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        loan = Loan.objects.using(LoanShards.get_alias("tenant-42")).get()
+        assert loan.client_id == "tenant-42"
+
+    @pytest.mark.django_db
+    def test_create_loan_idempotent_on_shard(self, loan_shards):
+        data = {
+            "purchase_price": 100000,
+            "interest_rate": 5.0,
+            "dollar_down_payment": 20000,
+            "percentage_down_payment": None,
+            "mortgage_term": 360,
+        }
+        alias = LoanShards.get_alias("tenant-42")
+
+        responses = [
+            self.client.post(
+                self.loans_url,
+                data,
+                format="json",
+                HTTP_X_CLIENT_ID="tenant-42",
+                HTTP_IDEMPOTENCY_KEY="abc",
+            )
+            for _ in range(2)
+        ]
+
+        assert [response.status_code for response in responses] == [201, 201]
+        assert responses[1].headers["Idempotent-Replayed"] == "true"
+        assert Loan.objects.using(alias).count() == 1
+        # The key is stored on the shard of the loan
+        assert IdempotencyKey.objects.using(alias).get().key == "abc"
+        assert not IdempotencyKey.objects.exists()
+
+    def test_create_loan_client_id_too_long(self, loan_shards):
+        response = self.client.post(
+            self.loans_url,
+            {
+                "purchase_price": 100000,
+                "interest_rate": 5.0,
+                "dollar_down_payment": 20000,
+                "percentage_down_payment": None,
+                "mortgage_term": 360,
+            },
+            format="json",
+            HTTP_X_CLIENT_ID="x" * 65,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "X-Client-Id" in response.data
+
+    def test_summary_over_shards(self, loan_shards):
+        for index, alias in enumerate(SHARDS):
+            create_loan(alias, created_at=datetime(2024, 1, 1), total_amount=index + 1)
+
+        response = self.client.get(f"{self.loans_url}summary/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        assert response.data["total_amount"] == {
+            "sum": 6,
+            "avg": 2,
+            "min": 1,
+            "max": 3,
+        }
+        assert list(get_loan_snapshots()) == SHARDS
+
+    def test_summarize_without_snapshots_rows(self, loan_shards):
+        summary = LoanAnalytics.summarize(*get_loan_snapshots().values())
+
+        assert summary["count"] == 0
+        assert summary["total_amount"]["min"] is None
+
+    @pytest.mark.django_db
+    def test_archive_loans_over_shards(self, loan_shards):
+        old = datetime(2020, 1, 1)
+        loans = [create_loan(alias, created_at=old) for alias in SHARDS]
+        create_loan("loans_1", created_at=datetime.now())
+
+        assert LoanArchiver.archive_loans(older_than_days=30, chunk_size=2) == 3
+
+        assert [Loan.objects.using(alias).count() for alias in SHARDS] == [0, 1, 0]
+        # Every shard numbers its loans from one, so only the shard tells them apart
+        assert sorted(ArchivedLoan.objects.values_list("shard", "loan_id")) == [
+            (loan._state.db, loan.id) for loan in loans
+        ]
+
+    def test_backfill_over_shards(self, loan_shards):
+        for alias in SHARDS:
+            create_loan(alias, created_at=datetime(2024, 1, 1))
+
+        assert LoanBackfiller.backfill(chunk_size=2) == 3
+
+        for alias in SHARDS:
+            assert Loan.objects.using(alias).get().mortgage_term_in_months == 60
+        assert LoanBackfiller.backfill(chunk_size=2) == 0
+
+    def test_export_loans_over_shards(self, loan_shards, tmp_path):
+        path = tmp_path / "loans.bin"
+        for index, alias in enumerate(SHARDS):
+            create_loan(alias, created_at=datetime(2024, 1, 1), total_amount=index)
+
+        assert LoanStoreJobs.export_loans(path, chunk_size=2) == 3
+
+        with LoanStoreReader(path) as reader:
+            rows = [
+                row for chunk in reader.chunks(2) for row in reader.iter_rows(chunk)
+            ]
+        assert sorted(row[4] for row in rows) == [0, 1, 2]
+        assert sorted(reader.strings) == sorted(
+            client_id_for(alias) for alias in SHARDS
+        )
+
+    def test_import_loans_over_shards(self, loan_shards, tmp_path):
+        path = tmp_path / "loans.bin"
+        for index, alias in enumerate(SHARDS):
+            create_loan(alias, created_at=datetime(2024, 1, 1), total_amount=index)
+        LoanStoreJobs.export_loans(path, chunk_size=2)
+        for alias in SHARDS:
+            Loan.objects.using(alias).all().delete()
+
+        assert LoanStoreJobs.import_loans(path, chunk_size=2) == 3
+
+        for index, alias in enumerate(SHARDS):
+            loan = Loan.objects.using(alias).get()
+            assert loan.client_id == client_id_for(alias)
+            assert loan.total_amount == index
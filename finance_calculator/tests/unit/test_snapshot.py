@@ -0,0 +1,117 @@
+import pytest
+
+from loan_calculator.models import Loan
+from loan_calculator.services.analytics import LoanAnalytics
+from loan_calculator.services.snapshot import LoanSnapshot
+
+
+@pytest.mark.django_db
+class TestLoanSnapshot:
+    loan_data = {
+        "total_amount": 100000,
+        "total_over_loan_term": 120000,
+        "mortgage_term": 5,
+        "interest_rate": 20000,
+        "monthly_payment": 2000,
+    }
+
+    def test_refresh_incremental(self):
+        snapshot = LoanSnapshot()
+        first = Loan.objects.create(**self.loan_data)
+
+        assert snapshot.refresh() == 1
+        assert snapshot.refresh() == 0
+
+        second = Loan.objects.create(**{**self.loan_data, "total_amount": 50000})
+
+        assert snapshot.refresh() == 1
+        assert list(snapshot.ids) == [first.id, second.id]
+        assert list(snapshot.column("total_amount")) == [100000, 50000]
+        assert snapshot.watermark == second.id
+        assert snapshot.nbytes() == 2 * 7 * 8
+
+    def test_refresh_rebuilds_after_delete(self):
+        snapshot = LoanSnapshot()
+        first = Loan.objects.create(**self.loan_data)
+        second = Loan.objects.create(**self.loan_data)
+        snapshot.refresh()
+
+        first.delete()
+
+        assert snapshot.refresh() == 1
+        assert list(snapshot.ids) == [second.id]
+
+    def test_refresh_rebuilds_after_update(self):
+        snapshot = LoanSnapshot()
+        loan = Loan.objects.create(**self.loan_data)
+        snapshot.refresh()
+
+        loan.monthly_payment = 3000
+        loan.save()
+
+        assert snapshot.refresh() == 1
+        assert list(snapshot.column("monthly_payment")) == [3000]
+
+    def test_refresh_skipped_within_ttl(self, monkeypatch, django_assert_num_queries):
+        monkeypatch.setattr(
+            "loan_calculator.services.snapshot.snapshot_config.TTL_SECONDS", 60
+        )
+        snapshot = LoanSnapshot()
+        snapshot.refresh()
+        Loan.objects.create(**self.loan_data)
+
+        with django_assert_num_queries(0):
+            assert snapshot.refresh() == 0
+
+        snapshot.checked_at -= 60
+
+        assert snapshot.refresh() == 1
+
+    def test_refresh_recounts_deletes_periodically(self, monkeypatch):
+        monkeypatch.setattr(
+            "loan_calculator.services.snapshot.snapshot_config.RECOUNT_SECONDS", 60
+        )
+        snapshot = LoanSnapshot()
+        first = Loan.objects.create(**self.loan_data)
+        second = Loan.objects.create(**self.loan_data)
+        snapshot.refresh()
+
+        first.delete()
+
+        assert snapshot.refresh() == 0
+        assert len(snapshot) == 2
+
+        snapshot.counted_at -= 60
+
+        assert snapshot.refresh() == 1
+        assert list(snapshot.ids) == [second.id]
+
+    def test_summarize(self):
+        snapshot = LoanSnapshot()
+        Loan.objects.create(**self.loan_data)
+        Loan.objects.create(**{**self.loan_data, "total_amount": 50000})
+        snapshot.refresh()
+
+        result = LoanAnalytics.summarize(snapshot)
+
+        assert result["count"] == 2
+        assert result["total_amount"] == {
+            "sum": 150000,
+            "avg": 75000,
+            "min": 50000,
+            "max": 100000,
+        }
+
+    def test_summarize_empty(self):
+        snapshot = LoanSnapshot()
+        snapshot.refresh()
+
+        result = LoanAnalytics.summarize(snapshot)
+
+        assert result["count"] == 0
+        assert result["monthly_payment"] == {
+            "sum": 0,
+            "avg": None,
+            "min": None,
+            "max": None,
+        }
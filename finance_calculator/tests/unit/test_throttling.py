@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+from rest_framework import status
+
+from loan_calculator.middleware import LoadSheddingMiddleware
+from loan_calculator.models import Loan
+from loan_calculator.services.shards import LoanShards
+from loan_calculator.throttling import (
+    InProcessTokenBucketStore,
+    SqliteTokenBucketStore,
+    TokenBucketThrottle,
+    refill_and_take,
+)
+
+
+class TestTokenBucket:
+    @pytest.mark.parametrize(
+        "tokens, elapsed, expected_tokens, expected_wait",
+        [
+            (5, 0, 4, 0),
+            (0, 0, 0, 0.5),
+            (0, 1, 1, 0),
+            (0.5, 0, 0.5, 0.25),
+            (9, 10, 9, 0),
+        ],
+    )
+    def test_refill_and_take(self, tokens, elapsed, expected_tokens, expected_wait):
+        result = refill_and_take(
+            tokens, updated_at=0, now=elapsed, capacity=10, refill_rate=2
+        )
+        assert result == (expected_tokens, expected_wait)
+
+    def test_in_process_store(self):
+        store = InProcessTokenBucketStore(max_clients=10)
+
+        waits = [
+            store.consume("client", capacity=3, refill_rate=0.001) for _ in range(4)
+        ]
+
+        assert waits[:3] == [0, 0, 0]
+        assert waits[3] > 0
+        assert store.consume("other", capacity=3, refill_rate=0.001) == 0
+
+    def test_in_process_store_prunes_full_buckets(self):
+        store = InProcessTokenBucketStore(max_clients=2)
+
+        for client in ("a", "b", "c"):
+            store.consume(client, capacity=3, refill_rate=1e9)
+
+        assert len(store._buckets) <= 2
+
+    def test_sqlite_store_shared_between_threads(self, tmp_path):
+        store = SqliteTokenBucketStore(path=str(tmp_path / "buckets.sqlite3"))
+        waits = []
+
+        def consume():
+            for _ in range(5):
+                waits.append(store.consume("client", capacity=10, refill_rate=0.001))
+
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(1 for wait in waits if wait == 0) == 10
+
+    def test_sqlite_store_locked_lets_request_through(self, tmp_path):
+        path = str(tmp_path / "buckets.sqlite3")
+        store = SqliteTokenBucketStore(path=path)
+        store.consume("client", capacity=1, refill_rate=0.001)
+        store._get_connection().execute("PRAGMA busy_timeout = 0")
+        locker = sqlite3.connect(path, isolation_level=None)
+        locker.execute("BEGIN IMMEDIATE")
+
+        try:
+            wait = store.consume("client", capacity=1, refill_rate=0.001)
+        finally:
+            locker.execute("ROLLBACK")
+            locker.close()
+
+        assert wait == 0
+        assert store.consume("client", capacity=1, refill_rate=0.001) > 0
+
+
+class TestTokenBucketThrottle:
+    factory = RequestFactory()
+
+    @pytest.fixture(autouse=True)
+    def api_keys(self, monkeypatch):
+        monkeypatch.setattr(
+            "loan_calculator.throttling.rate_limit_config.API_KEYS", {"known"}
+        )
+
+    def get_client_key(self, **headers):
+        request = self.factory.post("/api/v1/loans/", REMOTE_ADDR="10.0.0.1", **headers)
+        return TokenBucketThrottle().get_client_key(request)
+
+    def test_known_api_key(self):
+        key = self.get_client_key(HTTP_X_API_KEY="known")
+
+        assert key.startswith("key:")
+        assert "known" not in key
+
+    def test_unknown_api_keys_share_address_bucket(self):
+        keys = {
+            self.get_client_key(HTTP_X_API_KEY=f"key-{index}") for index in range(3)
+        }
+
+        assert keys == {"ip:10.0.0.1"}
+
+    def test_forwarded_for_ignored_without_proxies(self):
+        key = self.get_client_key(HTTP_X_FORWARDED_FOR="203.0.113.7")
+
+        assert key == "ip:10.0.0.1"
+
+
+class TestLoadSheddingMiddleware:
+    factory = RequestFactory()
+
+    def test_sheds_when_in_flight_exceeded(self, monkeypatch):
+        monkeypatch.setattr(
+            "loan_calculator.middleware.load_shedding_config.MAX_IN_FLIGHT", 1
+        )
+        middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+        middleware.in_flight = 1
+
+        response = middleware(self.factory.get("/api/v1/loans/"))
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+
+    def test_sheds_writes_when_database_slow(self, monkeypatch):
+        monkeypatch.setattr(
+            "loan_calculator.middleware.load_shedding_config.MAX_DB_LATENCY_MS", 100
+        )
+        middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+        middleware._db_latency_ms = 500
+
+        def process_view(request):
+            view_func = resolve(request.path_info).func
+            return middleware.process_view(request, view_func, (), {})
+
+        write = process_view(self.factory.post("/api/v1/loans/"))
+        read = process_view(self.factory.get("/api/v1/loans/"))
+        calculation = process_view(self.factory.post("/api/v1/loans/affordability/"))
+
+        assert write.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert read is None
+        assert calculation is None
+
+    def test_database_latency_decays(self):
+        middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+        middleware._db_latency_ms = 500
+        middleware._db_latency_updated_at -= 2 * middleware.LATENCY_HALF_LIFE_SECONDS
+
+        assert middleware.db_latency_ms == pytest.approx(125, rel=0.01)
+
+    def test_times_queries_of_every_shard(self, loan_shards):
+        def get_response(request):
+            LoanShards.fan_out(
+                lambda alias: Loan.objects.using(alias).count(), loan_shards
+            )
+            return HttpResponse()
+
+        middleware = LoadSheddingMiddleware(get_response)
+        middleware._db_latency_ms = 0
+
+        middleware(self.factory.get("/api/v1/loans/"))
+
+        assert middleware._db_latency_ms > 0